@@ -1,5 +1,6 @@
 import os
 import logging
+from datetime import datetime
 from dotenv import load_dotenv
 from flask import Flask, send_from_directory, jsonify
 from flask_migrate import Migrate
@@ -14,6 +15,9 @@ from models.menu_item_forecasts import MenuItemForecast
 # Import menu models to ensure relationships are established
 from models.menu_item import MenuItem
 from models.menu_item_image import MenuItemImage
+# Import the dashboard roll-ups so create_all() builds their tables
+from models.daily_order_stats import DailyOrderStats
+from models.menu_item_order_counts import MenuItemOrderCounts
 from routes import inventory, menu_planning, pricing, nutrition, order, register_routes, alerts, new_item_prediction, metrics, dashboard
 from routes.chatbot import chatbot_bp
 from routes.ai_agent import ai_agent_bp
@@ -80,6 +84,13 @@ def create_app():
     
     scheduler.add_job(id='LowStockCheck', func=scheduled_stock_check, trigger='interval', minutes=1)
 
+    def scheduled_order_stats_refresh():
+        with app.app_context():
+            DailyOrderStats.refresh()
+            MenuItemOrderCounts.refresh()
+
+    scheduler.add_job(id='DailyOrderStatsRefresh', func=scheduled_order_stats_refresh, trigger='interval', hours=1, next_run_time=datetime.now())
+
     @app.route("/")
     def index():
         return "Flask API is running!"
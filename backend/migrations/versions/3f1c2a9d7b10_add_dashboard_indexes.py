@@ -0,0 +1,49 @@
+"""Add indexes for dashboard query predicates
+
+The same indexes are declared in the models' __table_args__, so databases
+built by db.create_all() already have them; this revision only adds the
+ones missing from older databases and skips tables that do not exist yet.
+The mv_daily_order_stats and mv_menu_item_order_counts roll-up tables are
+created by db.create_all() at app start, not by a migration.
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('idx_customer_orders_date_menu_item', 'customer_orders', ['order_date', 'menu_item_id', 'total_price']),
+    ('idx_stock_alerts_type', 'stock_alerts', ['alert_type']),
+    ('idx_recipes_dish_ingredient', 'recipes', ['dish_id', 'ingredient_id']),
+    ('idx_inventory_ingredient', 'inventory', ['ingredient_id']),
+)
+
+
+def _existing_indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables and name not in _existing_indexes(inspector, table):
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, _ in reversed(INDEXES):
+        if table in tables and name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
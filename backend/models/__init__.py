@@ -10,5 +10,7 @@ from .menu_item import MenuItem
 from .customer_order import CustomerOrder
 from .menu_item_image import MenuItemImage
 from .menu_nutrition import MenuNutrition
+from .daily_order_stats import DailyOrderStats
+from .menu_item_order_counts import MenuItemOrderCounts
 
 from .stock_alert import StockAlert
\ No newline at end of file
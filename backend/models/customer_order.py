@@ -25,6 +25,11 @@ class CustomerOrder(db.Model):
     # Relationship to menu item
     menu_item = db.relationship('MenuItem', backref='orders', lazy=True)
 
+    # Covering index for the order_date range scans behind the dashboard sales figures
+    __table_args__ = (
+        db.Index('idx_customer_orders_date_menu_item', 'order_date', 'menu_item_id', 'total_price'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -80,11 +85,12 @@ class CustomerOrder(db.Model):
         
         from models.recipe import Recipe
         from models.ingredient import Ingredient
-        from sqlalchemy import func
+        from datetime import timedelta
         
-        # Get all orders for the specified date
+        # Get all orders for the specified date (range predicate so the order_date index can be used)
         orders = CustomerOrder.query.filter(
-            func.date(CustomerOrder.order_date) == date,
+            CustomerOrder.order_date >= date,
+            CustomerOrder.order_date < date + timedelta(days=1),
             CustomerOrder.order_status.in_(['confirmed', 'preparing', 'completed'])
         ).all()
         
@@ -105,21 +111,57 @@ class CustomerOrder(db.Model):
         
         return list(ingredient_usage.values())
 
+    @staticmethod
+    def get_ingredient_usage_range(start_date, end_date, unit_filter=None):
+        """Get ingredient usage per day and ingredient for an inclusive date range in one query."""
+        from models.recipe import Recipe
+        from models.ingredient import Ingredient
+        from models.menu_item import MenuItem
+        from datetime import timedelta
+        from sqlalchemy import func
+
+        usage_date = func.date(CustomerOrder.order_date)
+        query = db.session.query(
+            usage_date.label('usage_date'),
+            Ingredient.id.label('ingredient_id'),
+            Ingredient.name.label('ingredient_name'),
+            Ingredient.unit.label('unit'),
+            Ingredient.category.label('category'),
+            func.sum(Recipe.quantity_per_unit * CustomerOrder.quantity_ordered).label('total_quantity')
+        ).join(
+            MenuItem, MenuItem.id == CustomerOrder.menu_item_id
+        ).join(
+            Recipe, Recipe.dish_id == CustomerOrder.menu_item_id
+        ).join(
+            Ingredient, Ingredient.id == Recipe.ingredient_id
+        ).filter(
+            CustomerOrder.order_status.in_(['confirmed', 'preparing', 'completed']),
+            CustomerOrder.order_date >= start_date,
+            CustomerOrder.order_date < end_date + timedelta(days=1)
+        )
+
+        if unit_filter and unit_filter != 'all':
+            query = query.filter(Ingredient.unit == unit_filter)
+
+        return query.group_by(
+            usage_date, Ingredient.id, Ingredient.name, Ingredient.unit, Ingredient.category
+        ).order_by(usage_date).all()
+
     @staticmethod
     def get_ingredient_category_distribution(start_date=None, end_date=None, unit_filter=None):
         """Get ingredient usage distribution by category with optional unit filtering."""
         from models.recipe import Recipe
         from models.ingredient import Ingredient
-        from sqlalchemy import func
+        from datetime import timedelta
         
         query = CustomerOrder.query.filter(
             CustomerOrder.order_status.in_(['confirmed', 'preparing', 'completed'])
         )
         
         if start_date:
-            query = query.filter(func.date(CustomerOrder.order_date) >= start_date)
+            query = query.filter(CustomerOrder.order_date >= start_date)
         if end_date:
-            query = query.filter(func.date(CustomerOrder.order_date) <= end_date)
+            query = query.filter(CustomerOrder.order_date < end_date + timedelta(days=1))
         
         orders = query.all()
         category_usage = {}
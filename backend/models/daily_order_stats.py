@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from models import db
+
+class DailyOrderStats(db.Model):
+    """Per-day roll-up of customer orders, refreshed by the scheduler for dashboard reads."""
+    __tablename__ = 'mv_daily_order_stats'
+
+    order_day = db.Column(db.Date, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue_sum = db.Column(db.Float, nullable=False, default=0)
+    revenue_avg = db.Column(db.Float, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'<DailyOrderStats {self.order_day}: {self.order_count} orders>'
+
+    @staticmethod
+    def refresh(days=2):
+        """Recompute the roll-up rows for the last `days` days, or the whole order history when `days` is None."""
+        params = {'refreshed_at': datetime.now()}
+        where_clause = ''
+        if days is not None:
+            params['since'] = datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time())
+            where_clause = 'WHERE order_date >= :since'
+
+        db.session.execute(text(f"""
+            INSERT INTO mv_daily_order_stats (order_day, order_count, revenue_sum, revenue_avg, refreshed_at)
+            SELECT DATE(order_date), COUNT(*), SUM(total_price), AVG(total_price), :refreshed_at
+            FROM customer_orders
+            {where_clause}
+            GROUP BY DATE(order_date)
+            ON DUPLICATE KEY UPDATE
+                order_count = VALUES(order_count),
+                revenue_sum = VALUES(revenue_sum),
+                revenue_avg = VALUES(revenue_avg),
+                refreshed_at = VALUES(refreshed_at)
+        """), params)
+        db.session.commit()
@@ -12,6 +12,10 @@ class InventoryItem(db.Model):
     # Use string for relationship to avoid circular import
     ingredient = db.relationship('Ingredient', backref=db.backref('inventory_items', lazy=True, cascade='all, delete-orphan'))
 
+    __table_args__ = (
+        db.Index('idx_inventory_ingredient', 'ingredient_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import text
+from models import db
+
+class MenuItemOrderCounts(db.Model):
+    """Per-menu-item order count roll-up, refreshed by the scheduler for dashboard reads."""
+    __tablename__ = 'mv_menu_item_order_counts'
+
+    menu_item_id = db.Column(db.Integer, primary_key=True)  # menu_item.id; no FK so menu items stay deletable
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    last_refreshed = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'<MenuItemOrderCounts {self.menu_item_id}: {self.order_count} orders>'
+
+    @staticmethod
+    def refresh():
+        """Recompute every menu item's order count, replacing the previous roll-up in one transaction."""
+        db.session.execute(text("DELETE FROM mv_menu_item_order_counts"))
+        db.session.execute(text("""
+            INSERT INTO mv_menu_item_order_counts (menu_item_id, order_count, last_refreshed)
+            SELECT customer_orders.menu_item_id, COUNT(*), :last_refreshed
+            FROM customer_orders
+            JOIN menu_item ON menu_item.id = customer_orders.menu_item_id
+            GROUP BY customer_orders.menu_item_id
+        """), {'last_refreshed': datetime.now()})
+        db.session.commit()
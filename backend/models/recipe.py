@@ -9,6 +9,10 @@ class Recipe(db.Model):
     quantity_per_unit = db.Column(db.Float, nullable=False)
     recipe_unit = db.Column(db.String(20), nullable=True)  # Unit used in recipe (e.g., 'tsp', 'cup', 'piece')
 
+    __table_args__ = (
+        db.Index('idx_recipes_dish_ingredient', 'dish_id', 'ingredient_id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
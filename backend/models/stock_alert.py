@@ -17,6 +17,10 @@ class StockAlert(db.Model):
     alert_message = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('idx_stock_alerts_type', 'alert_type'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from models.menu_item import MenuItem, db
 from models.ingredient import Ingredient
 from models.inventory_item import InventoryItem
@@ -11,14 +11,28 @@ from services.unified_restaurant_demand_system import RestaurantDemandPredictor
 from services.autogen_ai_agent import AutoGenRestaurantAI, DishSuggestion
 import logging
 import json
+import random
 import re
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from sqlalchemy import func, text
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
+from sqlalchemy import Float, case, cast, event, func, text
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
 import google.generativeai as genai
 
-# Setup logging with UTF-8 encoding support
+# Setup logging with UTF-8 encoding support; characters the console
+# cannot encode (emoji on Windows code pages) are escaped by the stream
+# rather than stripped from every message beforehand
 import sys
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(errors='backslashreplace')
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -29,11 +43,723 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Load environment variables
+load_dotenv()
+
 chatbot_bp = Blueprint('chatbot', __name__)
 
+# Static Innovation Mode payloads (built once, not per request)
+_FLAVOR_PAIRINGS = (
+    {"base": "Chocolate", "pair": "Chili", "result": "Spicy Chocolate Dessert"},
+    {"base": "Watermelon", "pair": "Feta Cheese", "result": "Mediterranean Summer Salad"},
+    {"base": "Coffee", "pair": "Cardamom", "result": "Arabic-Inspired Coffee Blend"}
+)
+
+# (season name, seasonal idea) indexed by month // 3 % 4
+_SEASONAL_IDEAS = (
+    ('Winter', "❄️ **Winter Warmth Bowl** - Roasted root vegetables with spiced quinoa"),
+    ('Spring', "🌸 **Spring Renewal Salad** - Fresh greens with edible flowers"),
+    ('Summer', "☀️ **Summer Chill Gazpacho** - Cold vegetable soup with herb oil"),
+    ('Fall', "🍂 **Autumn Harvest Risotto** - Pumpkin and sage risotto")
+)
+
+@lru_cache(maxsize=len(_FLAVOR_PAIRINGS))
+def _flavor_pairing_payload(index=0):
+    """Build the flavor pairing response for the given pairing index"""
+    selected_pairing = _FLAVOR_PAIRINGS[index]
+    return {
+        'response': f"🎨 **INNOVATION MODE - Flavor Pairing**\n\n**Unique Combination:** {selected_pairing['base']} + {selected_pairing['pair']}\n\n**Creative Result:** {selected_pairing['result']}\n\n**Why it works:** Contrasting flavors create memorable taste experiences",
+        'type': 'flavor_pairing',
+        'data': {
+            'mode': 'INNOVATION',
+            'pairing': selected_pairing,
+            'ui_update': 'highlight_new_recipe'
+        }
+    }
+
+@lru_cache(maxsize=12)
+def _seasonal_payload(month):
+    """Build the seasonal menu response for the given month (1-12)"""
+    season, seasonal_idea = _SEASONAL_IDEAS[month // 3 % 4]
+    return {
+        'response': f"🍃 **INNOVATION MODE - Seasonal Menu**\n\n{seasonal_idea}\n\n**Seasonal Strategy:** Align menu with natural ingredient availability and customer mood",
+        'type': 'seasonal_innovation',
+        'data': {
+            'mode': 'INNOVATION',
+            'new_idea': seasonal_idea,
+            'season': season,
+            'ui_update': 'highlight_new_recipe'
+        }
+    }
+
+# Creative dish naming components
+_POETIC_ADJECTIVES = ("Crimson", "Aurora", "Citrus", "Velvet", "Golden", "Sapphire", "Emerald", "Moonlit", "Starlit", "Twilight", "Dawn", "Sunset", "Mystic", "Ethereal", "Silken", "Crystal", "Pearl", "Amber", "Rose", "Lavender")
+_DESCRIPTIVE_WORDS = ("Drift", "Mist", "Ember", "Whisper", "Echo", "Dream", "Melody", "Symphony", "Harmony", "Cascade", "Breeze", "Glow", "Shimmer", "Sparkle", "Bloom", "Blossom", "Essence", "Spirit", "Soul", "Heart")
+
+# Category-specific dish endings
+_DISH_ENDINGS = {
+    'Main Course': ("Medallion", "Wellington", "Roulade", "Confit", "Braise", "Gratin", "Casserole", "Steak", "Filet", "Roast", "Chop", "Cutlet"),
+    'Beverage': ("Fizz", "Elixir", "Brew", "Infusion", "Tonic", "Refresher", "Cooler", "Spritz", "Smoothie", "Latte", "Mocktail", "Blend"),
+    'Dessert': ("Tart", "Soufflé", "Mousse", "Parfait", "Galette", "Compote", "Reduction", "Crème", "Cake", "Pudding", "Truffle", "Gelato"),
+    'Side Dish': ("Medley", "Sauté", "Pilaf", "Gratin", "Salad", "Slaw", "Relish", "Chutney", "Puree", "Hash", "Chips", "Crisps")
+}
+_DEFAULT_DISH_ENDINGS = ("Tart", "Noodles", "Fizz", "Soufflé", "Risotto", "Bisque", "Mousse", "Parfait", "Galette", "Terrine", "Compote", "Reduction", "Infusion", "Medley", "Symphony", "Rhapsody", "Serenade", "Delight", "Fantasy")
+
+# Category-specific dish endings and descriptions for inventory-based dishes
+_INVENTORY_DISH_CATEGORIES = {
+    'Main Course': {
+        'emoji': '🍽️',
+        'endings': ("Wellington", "Medallion", "Roulade", "Confit", "Braise", "Gratin", "Casserole", "Filet", "Roast", "Chop"),
+        'description_templates': (
+            'A sophisticated main course featuring {ingredients} with modern culinary techniques and aromatic spices',
+            'An innovative fusion entrée combining {ingredients} creating a perfect balance of flavors and textures',
+            'A chef\'s signature main dish showcasing {ingredients} with creative presentation and bold flavor profiles'
+        )
+    },
+    'Beverage': {
+        'emoji': '🥤',
+        'endings': ("Fizz", "Elixir", "Brew", "Infusion", "Tonic", "Refresher", "Cooler", "Spritz", "Smoothie", "Blend"),
+        'description_templates': (
+            'A refreshing beverage infused with {ingredients} and complementary botanicals for a unique taste experience',
+            'An artisanal drink creation featuring {ingredients} with innovative preparation and signature flavors',
+            'A creative beverage blend highlighting {ingredients} with unexpected flavor combinations and aromatic notes'
+        )
+    },
+    'Dessert': {
+        'emoji': '🍰',
+        'endings': ("Tart", "Soufflé", "Mousse", "Parfait", "Galette", "Compote", "Crème", "Cake", "Pudding", "Truffle"),
+        'description_templates': (
+            'A decadent dessert creation featuring {ingredients} with elegant presentation and luxurious textures',
+            'An innovative sweet finale showcasing {ingredients} with modern pastry techniques and artistic flair',
+            'A sophisticated dessert masterpiece highlighting {ingredients} with creative preparation and indulgent flavors'
+        )
+    },
+    'Side Dish': {
+        'emoji': '🥗',
+        'endings': ("Medley", "Risotto", "Salad", "Gratin", "Sauté", "Pilaf", "Compote", "Reduction", "Terrine", "Relish"),
+        'description_templates': (
+            'A vibrant side dish featuring {ingredients} with seasonal accompaniments and fresh herbs',
+            'An artisanal accompaniment showcasing {ingredients} with innovative cooking techniques and complementary flavors',
+            'A creative side creation highlighting {ingredients} with modern preparation and colorful presentation'
+        )
+    }
+}
+
+# Dish type keywords and preferences for regeneration requests
+_DISH_TYPES = {
+    'appetizer': {
+        'keywords': ['appetizer', 'starter', 'app', 'small plate', 'finger food', 'tapas', 'bruschetta'],
+        'preferences': ['light', 'crispy', 'fresh', 'savory', 'bite-sized']
+    },
+    'main course': {
+        'keywords': ['main', 'entree', 'main course', 'dinner', 'lunch', 'protein', 'hearty'],
+        'preferences': ['filling', 'protein-rich', 'balanced', 'satisfying', 'comfort food']
+    },
+    'dessert': {
+        'keywords': ['dessert', 'sweet', 'cake', 'ice cream', 'pudding', 'chocolate', 'fruit'],
+        'preferences': ['sweet', 'indulgent', 'creamy', 'fruity', 'rich', 'light']
+    },
+    'beverage': {
+        'keywords': ['drink', 'beverage', 'cocktail', 'juice', 'smoothie', 'tea', 'coffee'],
+        'preferences': ['refreshing', 'energizing', 'warming', 'cooling', 'healthy']
+    },
+    'side dish': {
+        'keywords': ['side', 'side dish', 'accompaniment', 'vegetable', 'grain'],
+        'preferences': ['complementary', 'nutritious', 'colorful', 'textural']
+    }
+}
+
+# User preference keywords detected in regeneration requests
+_PREFERENCE_KEYWORDS = {
+    'healthy': ['healthy', 'nutritious', 'low-calorie', 'diet', 'wellness'],
+    'spicy': ['spicy', 'hot', 'chili', 'pepper', 'heat'],
+    'vegetarian': ['vegetarian', 'veggie', 'plant-based', 'meatless'],
+    'vegan': ['vegan', 'plant-only', 'dairy-free'],
+    'gluten-free': ['gluten-free', 'celiac', 'wheat-free'],
+    'comfort': ['comfort', 'hearty', 'warming', 'cozy'],
+    'light': ['light', 'fresh', 'clean', 'simple'],
+    'gourmet': ['gourmet', 'fancy', 'upscale', 'elegant', 'sophisticated'],
+    'quick': ['quick', 'fast', 'easy', 'simple', '15 minutes'],
+    'seasonal': ['seasonal', 'fresh', 'local', 'farm-to-table']
+}
+
+# Base suggestions for each dish type in regeneration requests
+_BASE_SUGGESTIONS = {
+    'appetizer': (
+        {'name': 'Mediterranean Mezze Platter', 'ingredients': 'hummus, olives, feta, pita', 'prep_time': 15, 'style': 'Mediterranean'},
+        {'name': 'Crispy Calamari Rings', 'ingredients': 'squid, flour, spices, marinara', 'prep_time': 20, 'style': 'Italian'},
+        {'name': 'Seasonal Bruschetta Trio', 'ingredients': 'bread, tomatoes, basil, cheese', 'prep_time': 12, 'style': 'Italian'}
+    ),
+    'main course': (
+        {'name': 'Herb-Crusted Salmon', 'ingredients': 'salmon, herbs, quinoa, vegetables', 'prep_time': 25, 'style': 'Contemporary'},
+        {'name': 'Grilled Chicken Teriyaki', 'ingredients': 'chicken, teriyaki sauce, rice, vegetables', 'prep_time': 30, 'style': 'Asian'},
+        {'name': 'Pasta Primavera', 'ingredients': 'pasta, seasonal vegetables, olive oil, parmesan', 'prep_time': 20, 'style': 'Italian'}
+    ),
+    'dessert': (
+        {'name': 'Chocolate Lava Cake', 'ingredients': 'chocolate, butter, eggs, flour', 'prep_time': 25, 'style': 'Decadent'},
+        {'name': 'Fresh Berry Parfait', 'ingredients': 'berries, yogurt, granola, honey', 'prep_time': 10, 'style': 'Light'},
+        {'name': 'Tiramisu', 'ingredients': 'mascarpone, coffee, ladyfingers, cocoa', 'prep_time': 30, 'style': 'Italian'}
+    ),
+    'beverage': (
+        {'name': 'Tropical Smoothie', 'ingredients': 'mango, pineapple, coconut, lime', 'prep_time': 5, 'style': 'Refreshing'},
+        {'name': 'Artisan Coffee Blend', 'ingredients': 'premium coffee beans, steamed milk', 'prep_time': 8, 'style': 'Energizing'},
+        {'name': 'Herbal Tea Infusion', 'ingredients': 'chamomile, honey, lemon', 'prep_time': 5, 'style': 'Calming'}
+    ),
+    'side dish': (
+        {'name': 'Roasted Seasonal Vegetables', 'ingredients': 'mixed vegetables, olive oil, herbs', 'prep_time': 20, 'style': 'Healthy'},
+        {'name': 'Garlic Herb Rice', 'ingredients': 'rice, garlic, herbs, butter', 'prep_time': 15, 'style': 'Comfort'},
+        {'name': 'Quinoa Salad', 'ingredients': 'quinoa, vegetables, vinaigrette', 'prep_time': 18, 'style': 'Nutritious'}
+    )
+}
+
+# Description templates for preference-adjusted suggestions, latest-applied preference first
+_PREFERENCE_DESCRIPTIONS = (
+    ('gourmet', "An elevated, restaurant-quality {name}"),
+    ('quick', "A quick and easy {name} ready in minutes"),
+    ('gluten-free', "A gluten-free version of {name}"),
+    ('vegan', "A completely plant-based {name}"),
+    ('vegetarian', "A plant-based {name} full of flavor"),
+    ('spicy', "A fiery version of {name} with bold heat"),
+    ('healthy', "A nutritious {name} packed with wholesome ingredients")
+)
+_SUGGESTION_PREFERENCES = frozenset(preference for preference, _ in _PREFERENCE_DESCRIPTIONS)
+_DEFAULT_SUGGESTION_DESCRIPTION = "A delicious {name} featuring {first_ingredient} and complementary flavors"
+
+# Featured suggestions for the four menu categories
+_FOUR_CATEGORY_SUGGESTIONS = {
+    'Main Course': {
+        'emoji': '🍽️',
+        'suggestions': (
+            {'name': 'Grilled Salmon with Herb Butter', 'description': 'A perfectly seasoned salmon fillet grilled to perfection and topped with a fragrant herb butter made with fresh dill, parsley, and garlic. Served with lemon wedges for a bright, fresh finish.', 'prep_time': 25, 'price': '$24.99'},
+            {'name': 'Herb-Crusted Chicken Breast', 'description': 'Tender chicken breast coated with aromatic herbs and spices, pan-seared to golden perfection. Served with roasted vegetables and garlic mashed potatoes.', 'prep_time': 30, 'price': '$22.99'},
+            {'name': 'Beef Tenderloin Medallions', 'description': 'Premium beef tenderloin medallions cooked to your preference, served with red wine reduction sauce and seasonal vegetables.', 'prep_time': 35, 'price': '$32.99'}
+        )
+    },
+    'Beverage': {
+        'emoji': '🥤',
+        'suggestions': (
+            {'name': 'Tropical Mango Smoothie', 'description': 'A refreshing blend of ripe mango, coconut milk, pineapple juice, and a hint of lime. Garnished with toasted coconut flakes and served chilled for the perfect tropical escape.', 'prep_time': 5, 'price': '$8.99'},
+            {'name': 'Artisan Cold Brew Coffee', 'description': 'Smooth and rich cold brew coffee made from premium beans, served over ice with a choice of milk or cream. Perfect for coffee enthusiasts.', 'prep_time': 3, 'price': '$5.99'},
+            {'name': 'Fresh Berry Lemonade', 'description': 'House-made lemonade infused with fresh mixed berries, mint leaves, and a touch of sparkling water for a refreshing twist.', 'prep_time': 8, 'price': '$6.99'}
+        )
+    },
+    'Dessert': {
+        'emoji': '🍰',
+        'suggestions': (
+            {'name': 'Classic Chocolate Lava Cake', 'description': 'A decadent individual chocolate cake with a molten chocolate center that flows out when cut. Served warm with a scoop of vanilla ice cream and a dusting of powdered sugar.', 'prep_time': 25, 'price': '$12.99'},
+            {'name': 'Tiramisu Parfait', 'description': 'Layers of coffee-soaked ladyfingers, mascarpone cream, and cocoa powder, elegantly presented in a glass parfait. A classic Italian dessert with a modern twist.', 'prep_time': 20, 'price': '$10.99'},
+            {'name': 'Fresh Berry Cheesecake', 'description': 'Creamy New York-style cheesecake topped with a medley of fresh seasonal berries and a light berry coulis. Served on a graham cracker crust.', 'prep_time': 15, 'price': '$11.99'}
+        )
+    },
+    'Side Dish': {
+        'emoji': '🥗',
+        'suggestions': (
+            {'name': 'Roasted Rainbow Vegetables', 'description': 'A colorful medley of seasonal vegetables including bell peppers, zucchini, carrots, and red onions, roasted with olive oil, fresh herbs, and a touch of balsamic glaze.', 'prep_time': 20, 'price': '$7.99'},
+            {'name': 'Garlic Parmesan Risotto', 'description': 'Creamy Arborio rice slowly cooked with garlic, white wine, and vegetable broth, finished with fresh Parmesan cheese and herbs.', 'prep_time': 25, 'price': '$9.99'},
+            {'name': 'Quinoa Power Salad', 'description': 'Nutritious quinoa mixed with fresh vegetables, dried cranberries, toasted nuts, and a light lemon vinaigrette dressing.', 'prep_time': 15, 'price': '$8.99'}
+        )
+    }
+}
+
+@lru_cache(maxsize=1)
+def _four_category_payload():
+    """Build the four-category suggestions response, one featured dish per category"""
+    # Build the response with one suggestion from each category
+    parts = ["🍽️ **Here are my dish suggestions, one from each category:**\n\n"]
+    
+    for category_name, category_data in _FOUR_CATEGORY_SUGGESTIONS.items():
+        # Select the first suggestion from each category
+        suggestion = category_data['suggestions'][0]
+        emoji = category_data['emoji']
+        
+        parts.append(f"## **{emoji} {category_name}**\n")
+        parts.append(f"**{suggestion['name']}** - {suggestion['description']}\n\n")
+    
+    parts.append("Each dish offers a unique flavor profile and would complement a well-rounded dining experience!\n\n")
+    parts.append("💡 **Want more options?** Ask me for specific preferences like:\n")
+    parts.append("• 'Suggest spicy main courses'\n")
+    parts.append("• 'Recommend healthy beverages'\n")
+    parts.append("• 'Show me Italian desserts'")
+    
+    return {
+        'response': "".join(parts),
+        'type': 'four_category_suggestions',
+        'data': {
+            'suggestions': _FOUR_CATEGORY_SUGGESTIONS,
+            'ui_update': 'highlight_category_suggestions'
+        }
+    }
+
+# Recipe keywords recognised by auto apply and the dish they map to, in priority order
+_AUTO_APPLY_DISHES = (
+    ('bowl', 'Mediterranean Quinoa Power Bowl'),
+    ('salad', 'Harvest Kale & Roasted Vegetable Salad'),
+    ('soup', 'Roasted Tomato Basil Bisque'),
+    ('fusion', 'Korean-Mexican Bulgogi Tacos'),
+    ('platter', 'Artisan Charcuterie & Cheese Board'),
+    ('medley', 'Seasonal Vegetable Medley'),
+    ('pasta', 'Truffle Mushroom Linguine'),
+    ('chicken', 'Herb-Crusted Chicken Breast'),
+    ('beef', 'Grass-Fed Beef Tenderloin'),
+    ('fish', 'Pan-Seared Atlantic Salmon'),
+    ('pizza', 'Artisan Margherita Pizza'),
+    ('burger', 'Gourmet Wagyu Burger'),
+    ('sandwich', 'Grilled Panini Sandwich'),
+    ('wrap', 'Mediterranean Veggie Wrap'),
+    ('curry', 'Thai Green Curry'),
+    ('stir fry', 'Asian Vegetable Stir Fry'),
+    ('risotto', 'Wild Mushroom Risotto'),
+    ('gnocchi', 'Sage Butter Gnocchi')
+)
+
+def _build_keyword_matcher(keyword_labels):
+    """Compile a {keyword: labels} mapping into a single-pass substring matcher.
+    
+    The lookahead alternation reports the longest keyword starting at every
+    position; shorter keywords starting at the same position are prefixes of it,
+    so their labels are folded into the longer keyword's labels up front.
+    """
+    keywords = sorted(keyword_labels, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in keywords) + '))')
+    labels = {
+        keyword: frozenset().union(*(keyword_labels[prefix] for prefix in keyword_labels if keyword.startswith(prefix)))
+        for keyword in keywords
+    }
+    return pattern, labels
+
+def _match_keywords(matcher, text):
+    """Return the set of labels whose keywords occur as substrings of text"""
+    pattern, labels = matcher
+    matched = set()
+    for match in pattern.finditer(text):
+        matched |= labels[match.group(1)]
+    return matched
+
+def _build_substitution(replacements):
+    """Compile a {old: new} mapping into a single-pass substring substitution"""
+    pattern = re.compile('|'.join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)))
+    return pattern, lambda match: replacements[match.group(0)]
+
+def _substitute(substitution, text):
+    """Apply every replacement of a compiled substitution in one scan of text"""
+    pattern, replace = substitution
+    return pattern.sub(replace, text)
+
+# Ingredient substitutions applied for dietary preferences
+_VEGETARIAN_SUBSTITUTION = _build_substitution({'chicken': 'tofu', 'salmon': 'portobello mushroom'})
+_VEGAN_SUBSTITUTION = _build_substitution({'cheese': 'nutritional yeast', 'butter': 'olive oil', 'yogurt': 'coconut yogurt'})
+_GLUTEN_FREE_SUBSTITUTION = _build_substitution({'flour': 'almond flour', 'pasta': 'rice noodles', 'bread': 'gluten-free bread'})
+
+# Per-type/per-preference keyword sets matched against whole message words
+_DISH_TYPE_KEYWORD_SETS = {dish_type: frozenset(info['keywords']) for dish_type, info in _DISH_TYPES.items()}
+_PREFERENCE_KEYWORD_SETS = {preference: frozenset(keywords) for preference, keywords in _PREFERENCE_KEYWORDS.items()}
+
+_WORD_RE = re.compile(r"[a-z0-9\-]+")
+
+def _message_terms(message_lower):
+    """Collect the words of a lower-cased message, their singular forms and adjacent word pairs"""
+    words = _WORD_RE.findall(message_lower)
+    singular = [word[:-1] if word.endswith('s') and len(word) > 3 else word for word in words]
+    terms = set(words)
+    terms.update(singular)
+    for sequence in (words, singular):
+        terms.update(f'{first} {second}' for first, second in zip(sequence, sequence[1:]))
+    return terms
+
+# Presentation styles for simulated dish photos
+_IMAGE_STYLES = ('Professional Studio', 'Rustic Plating', 'Modern Minimalist', 'Artistic Presentation')
+
+# Peak ordering windows reported with every demand prediction
+_PEAK_HOURS = ('12:00-14:00', '18:00-20:00')
+
+# Quality checks for generated dish data: values below warn_below or above
+# warn_above get a warning, otherwise values from points_from earn points
+_VALIDATION_RULES = (
+    # (section, field, warn_below, low_warning, warn_above, high_warning, points, points_from)
+    ('pricing', 'price', 5.00, 'Price may be too low for profitability', 50.00, 'Price may be too high for target market', 25, 5.00),
+    ('pricing', 'margin', 50, 'Profit margin below recommended 50%', 80, 'Profit margin may be too high', 25, 50),
+    ('nutrition', 'calories', 200, 'Calorie content may be too low', 1200, 'Calorie content may be too high', 20, 200),
+    ('nutrition', 'protein', 10, 'Protein content may be insufficient', None, None, 15, 10),
+    ('nutrition', 'health_score', 5, 'Health score below recommended level', None, None, 15, 7),
+    ('demand', 'confidence', 70, 'Demand prediction confidence is low', None, None, 15, 70),
+    ('demand', 'weekly_sales', 10, 'Predicted sales volume may be too low', 100, 'Predicted sales volume may be unrealistic', 0, 10)
+)
+
+# Dish name words that shift predicted demand with the season
+_WARM_DISH_WORDS = frozenset({'soup', 'warm', 'hot'})
+_COLD_DISH_WORDS = frozenset({'salad', 'cold', 'fresh'})
+
+# Labels are priority positions in _AUTO_APPLY_DISHES
+_AUTO_APPLY_MATCHER = _build_keyword_matcher({keyword: {index} for index, (keyword, _) in enumerate(_AUTO_APPLY_DISHES)})
+
+# Dietary preferences and cuisine styles for AI agent requests, in priority order,
+# with the keywords that select them
+_DIETARY_KEYWORDS = (
+    ('vegetarian', ('vegetarian', 'veggie')),
+    ('vegan', ('vegan',)),
+    ('gluten-free', ('gluten free', 'gluten-free', 'no gluten')),
+    ('low-carb', ('low carb', 'low-carb', 'keto')),
+    ('healthy', ('healthy', 'nutritious', 'light')),
+    ('spicy', ('spicy', 'hot', 'chili'))
+)
+
+_CUISINE_KEYWORDS = (
+    ('Italian', ('italian', 'pasta', 'pizza')),
+    ('Asian', ('asian', 'chinese', 'japanese', 'thai')),
+    ('Mexican', ('mexican', 'taco', 'burrito')),
+    ('Mediterranean', ('mediterranean', 'greek')),
+    ('French', ('french',)),
+    ('Indian', ('indian', 'curry')),
+    ('American', ('american', 'burger'))
+)
+
+def _keyword_table_matcher(keyword_table):
+    """Matcher over a (label, keywords) table, labelled with table positions"""
+    keyword_labels = {}
+    for index, (_, keywords) in enumerate(keyword_table):
+        for keyword in keywords:
+            keyword_labels.setdefault(keyword, set()).add(index)
+    return _build_keyword_matcher(keyword_labels)
+
+_DIETARY_MATCHER = _keyword_table_matcher(_DIETARY_KEYWORDS)
+_CUISINE_MATCHER = _keyword_table_matcher(_CUISINE_KEYWORDS)
+
+# Bumped after every commit that inserts, updates or deletes Ingredient rows
+_ingredient_names_version = 0
+
+@event.listens_for(Session, 'after_flush')
+def _track_ingredient_changes(session, flush_context):
+    """Flag the transaction when it touches Ingredient rows"""
+    if any(isinstance(obj, Ingredient) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['ingredients_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _bump_ingredient_names_version(session):
+    """Invalidate the cached ingredient names once ingredient changes are committed"""
+    global _ingredient_names_version
+    if session.info.pop('ingredients_changed', False):
+        _ingredient_names_version += 1
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_ingredient_changes(session):
+    """Forget ingredient changes from a rolled back transaction"""
+    session.info.pop('ingredients_changed', None)
+
+@lru_cache(maxsize=1)
+def _all_ingredient_names(version):
+    """Names of all ingredients, reloaded whenever the version changes"""
+    return tuple(name for (name,) in db.session.query(Ingredient.name).order_by(Ingredient.id))
+
+@lru_cache(maxsize=8)
+def _shortest_ingredient_name_length(ingredient_names):
+    """Length of the shortest ingredient name; shorter messages cannot mention any ingredient"""
+    return min(map(len, ingredient_names))
+
+@lru_cache(maxsize=8)
+def _ingredient_matcher(ingredient_names):
+    """Matcher over lower-cased ingredient names, labelled with their positions"""
+    keyword_labels = {}
+    for index, name in enumerate(ingredient_names):
+        keyword_labels.setdefault(name.lower(), set()).add(index)
+    return _build_keyword_matcher(keyword_labels)
+
+@lru_cache(maxsize=256)
+def _mentioned_ingredient_names(version, message_lower):
+    """Names of the ingredients mentioned in a lower-cased message, in ingredient order"""
+    ingredient_names = _all_ingredient_names(version)
+    if not ingredient_names or len(message_lower) < _shortest_ingredient_name_length(ingredient_names):
+        return ()
+    mentioned_indexes = _match_keywords(_ingredient_matcher(ingredient_names), message_lower)
+    return tuple(ingredient_names[index] for index in sorted(mentioned_indexes))
+
+def _nutrition_balance_score(nutritional_balance):
+    """Score 0-100 for how close the protein share of the macros is to a third"""
+    total_protein = total_carbs = total_fat = 0
+    for profile in nutritional_balance.values():
+        total_protein += profile['protein']
+        total_carbs += profile['carbs']
+        total_fat += profile['fat']
+    
+    balance_score = 100 - abs(33.3 - (total_protein / (total_protein + total_carbs + total_fat + 0.1) * 100))
+    return min(max(balance_score, 0), 100)
+
+@lru_cache(maxsize=256)
+def _simulate_dish_attributes(dish_name):
+    """Simulated image, demand, pricing and nutrition for a dish in a single pass.
+    
+    The random draws come from a generator seeded with the dish name, so a dish
+    always gets the same attributes and the result is safe to memoize.
+    """
+    rng = random.Random(dish_name)
+    name_lc = dish_name.lower()
+    
+    # Simulate AI image generation
+    image = {
+        'status': 'Generated successfully',
+        'style': rng.choice(_IMAGE_STYLES),
+        'resolution': '1920x1080',
+        'format': 'PNG',
+        'lighting': 'Natural daylight',
+        'composition': 'Rule of thirds'
+    }
+    
+    # Simulate demand prediction: base confidence on dish type and ingredients,
+    # then adjust for seasonal factors
+    base_confidence = rng.randint(70, 95)
+    weekly_sales = rng.randint(15, 45)
+    
+    seasonal_factor = 1.0
+    name_terms = _message_terms(name_lc)
+    if not name_terms.isdisjoint(_WARM_DISH_WORDS):
+        seasonal_factor = 1.2  # Higher demand in winter
+    elif not name_terms.isdisjoint(_COLD_DISH_WORDS):
+        seasonal_factor = 1.1  # Higher demand in summer
+    
+    demand = {
+        'confidence': base_confidence,
+        'weekly_sales': int(weekly_sales * seasonal_factor),
+        'seasonal_factor': seasonal_factor,
+        'trend': 'Increasing' if base_confidence > 85 else 'Stable',
+        'peak_hours': _PEAK_HOURS
+    }
+    
+    # Simulate pricing optimization
+    base_cost = rng.uniform(4.50, 8.00)
+    target_margin = rng.uniform(60, 75)  # 60-75% margin
+    
+    optimized_price = base_cost / (1 - target_margin/100)
+    
+    # Round to .99 or .49 pricing
+    if optimized_price % 1 < 0.5:
+        final_price = int(optimized_price) + 0.49
+    else:
+        final_price = int(optimized_price) + 0.99
+    
+    actual_margin = ((final_price - base_cost) / final_price) * 100
+    
+    pricing = {
+        'price': final_price,
+        'cost': base_cost,
+        'margin': round(actual_margin, 1),
+        'competitive_range': f'${final_price-2:.2f} - ${final_price+3:.2f}',
+        'strategy': 'Premium positioning' if final_price > 15 else 'Value positioning'
+    }
+    
+    # Simulate nutrition calculation
+    calories = rng.randint(300, 800)
+    protein = rng.randint(15, 45)
+    carbs = rng.randint(25, 60)
+    fat = rng.randint(10, 35)
+    fiber = rng.randint(3, 12)
+    
+    # Calculate health score based on nutrition balance: base score plus protein
+    # and fiber bonuses, minus a penalty for very high calories
+    health_score = max(1, min(10, 5
+        + (2 if protein >= 25 else 1 if protein >= 20 else 0)
+        + (2 if fiber >= 8 else 1 if fiber >= 5 else 0)
+        - (1 if calories > 700 else 0)))
+    
+    # Generate description
+    description = f"A nutritious {name_lc} featuring balanced macronutrients"
+    if health_score >= 8:
+        description += " and exceptional health benefits"
+    elif health_score >= 6:
+        description += " with good nutritional value"
+    
+    nutrition = {
+        'calories': calories,
+        'protein': protein,
+        'carbs': carbs,
+        'fat': fat,
+        'fiber': fiber,
+        'health_score': health_score,
+        'description': description,
+        'allergens': ['May contain gluten', 'Contains dairy'],
+        'dietary_tags': ['High Protein'] if protein >= 25 else ['Balanced']
+    }
+    
+    return {
+        'image': image,
+        'demand': demand,
+        'pricing': pricing,
+        'nutrition': nutrition
+    }
+
+# Reply for a dish run through the auto apply pipeline; filled with format_map
+_AUTO_APPLY_TEMPLATE = (
+    "🤖 **Auto-Applying: {dish_name}**\n\n"
+    "**🔄 AI Processing Pipeline:**\n\n"
+    "✅ **Image Generation**: {image[status]}\n"
+    "   📸 Style: {image[style]}\n\n"
+    "✅ **Demand Prediction**: {demand[confidence]}% confidence\n"
+    "   📊 Expected weekly sales: {demand[weekly_sales]} units\n\n"
+    "✅ **Pricing Optimization**: ${pricing[price]:.2f}\n"
+    "   💰 Profit margin: {pricing[margin]}%\n\n"
+    "✅ **Nutrition Analysis**: {nutrition[calories]} calories\n"
+    "   🥗 Health score: {nutrition[health_score]}/10\n\n"
+    "✅ **Quality Validation**: {validation[quality_level]} ({validation[quality_score]}/100)\n\n"
+    "{improvements}"
+    "**📋 Complete Menu Item Generated:**\n\n"
+    "**{dish_name}**\n"
+    "*{final[nutrition][description]}*\n\n"
+    "💰 **Price**: ${final[pricing][price]:.2f}\n"
+    "📊 **Demand Score**: {final[demand][confidence]}%\n"
+    "🥗 **Nutrition**: {final[nutrition][calories]} cal | {final[nutrition][protein]}g protein\n"
+    "🖼️ **Image**: Professional photo ready\n"
+    "🎯 **Quality Level**: {validation[quality_level]}\n\n"
+    "**✨ Ready to add to menu!** Click 'Confirm' to finalize."
+)
+
+@lru_cache(maxsize=64)
+def _compute_auto_apply_dish(pipeline, dish_name):
+    """Run the auto apply pipeline for a dish; results are reused for repeat requests.
+    
+    Errors propagate to the caller so that failed runs are not cached.
+    """
+    # Steps 1-4: Image generation, demand prediction, pricing optimization and
+    # nutrition calculation, simulated together
+    generated_data = pipeline._generate_dish_attributes(dish_name)
+    
+    # Step 5: Quality Validation and Improvement
+    validation_result = pipeline._validate_dish_data(generated_data)
+    
+    # Apply automatic improvements if needed
+    improvements = pipeline._apply_quality_improvements(generated_data, validation_result)
+    if improvements['success'] and improvements['improvements_made']:
+        improvements_text = "🔧 **Quality Improvements Applied:**\n" + "".join(
+            f"   • {improvement}\n" for improvement in improvements['improvements_made']
+        ) + "\n"
+        # Use improved data
+        final_data = improvements['improved_data']
+    else:
+        improvements_text = ""
+        final_data = generated_data
+    
+    # Generate quality report
+    quality_report = pipeline._generate_quality_report(dish_name, validation_result, improvements)
+    
+    response = _AUTO_APPLY_TEMPLATE.format_map({
+        'dish_name': dish_name,
+        'image': generated_data['image'],
+        'demand': generated_data['demand'],
+        'pricing': generated_data['pricing'],
+        'nutrition': generated_data['nutrition'],
+        'validation': validation_result,
+        'improvements': improvements_text,
+        'final': final_data
+    })
+    
+    return {
+        'response': response,
+        'type': 'auto_apply_complete',
+        'data': {
+            'mode': 'INNOVATION',
+            'dish_name': dish_name,
+            'generated_data': final_data,
+            'validation_results': validation_result,
+            'quality_report': quality_report,
+            'improvements_applied': improvements['improvements_made'] if improvements['success'] else [],
+            'ui_update': 'show_auto_apply_result'
+        }
+    }
+
+# Dish names given in quotes, or as capitalized words ending in a dish type
+_QUOTED_DISH_NAME_RE = re.compile(r'"([^"]+)"')
+_CAPITALIZED_DISH_NAME_RE = re.compile(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Risotto|Bowl|Salad|Soup|Pasta|Pizza|Burger|Sandwich)))')
+
+_SUGGESTION_NUMBER_RE = re.compile(r'suggestion (\d+)', re.IGNORECASE)
+
+def _extract_suggestion_number(message):
+    """Suggestion number referenced in a message such as 'Auto apply suggestion 2', '1' by default"""
+    suggestion_match = _SUGGESTION_NUMBER_RE.search(message)
+    return suggestion_match.group(1) if suggestion_match else '1'
+
+# Replies for applying one of the proactive dish suggestions; filled with the suggestion number
+_AUTO_APPLY_SUGGESTION_TEMPLATE = (
+    "🤖 **Auto Applying Suggestion {number}**\n\n"
+    "**AI Processing Complete:**\n"
+    "✅ Nutritional analysis calculated\n"
+    "✅ Optimal pricing determined\n"
+    "✅ Professional image generated\n"
+    "✅ Demand forecast completed\n"
+    "✅ Menu item compiled\n\n"
+    "**Suggestion {number} has been automatically added to your menu!**\n\n"
+    "🎯 **Next Steps:**\n"
+    "• View the new item in your menu management\n"
+    "• Customize further if needed\n"
+    "• Start promoting to customers"
+)
+
+_MANUAL_APPLY_SUGGESTION_TEMPLATE = (
+    "✏️ **Manual Apply - Suggestion {number}**\n\n"
+    "**Customize Your Dish Details:**\n\n"
+    "📝 **Name:** [Edit dish name]\n"
+    "📄 **Description:** [Modify description]\n"
+    "🥘 **Ingredients:** [Adjust ingredient list]\n"
+    "💰 **Price:** [Set your preferred price]\n"
+    "📂 **Category:** [Choose category]\n"
+    "⏱️ **Prep Time:** [Estimate preparation time]\n\n"
+    "**💡 Instructions:**\n"
+    "Please provide the details in this format:\n"
+    "Name: [Your dish name]\n"
+    "Description: [Your description]\n"
+    "Ingredients: [Your ingredients]\n"
+    "Price: $[Your price]\n"
+    "Category: [Your category]\n\n"
+    "I'll help you create the complete menu item with enhanced features!"
+)
+
+# DishSuggestion fields returned to the client by AI dish creation
+# (everything except the internal market_analysis)
+_DISH_SUGGESTION_FIELDS = (
+    'name', 'description', 'category', 'cuisine_type', 'ingredients',
+    'estimated_cost', 'suggested_price', 'predicted_demand',
+    'creativity_score', 'feasibility_score', 'nutrition_score', 'overall_score',
+    'recipe_instructions', 'nutrition_data'
+)
+
+# AI agent workflow steps as (result key, display label), in execution order
+_WORKFLOW_STEP_NAMES = (
+    ('step1_extract_ingredients', '1. Extract Ingredients'),
+    ('step2_dish_suggestion', '2. Innovative Dish Suggestion'),
+    ('step3_menu_item_creation', '3. Add Menu Item & AI Image'),
+    ('step4_recipe_creation', '4. Set Recipe'),
+    ('step5_forecast_generation', '5. Run Forecast'),
+    ('step6_price_optimization', '6. Price Recommendation'),
+    ('step7_nutrition_analysis', '7. Generate Nutrition')
+)
+
+# Fixed instruction for Q&A mode, passed to Gemini as the system instruction
+_QNA_SYSTEM_INSTRUCTION = (
+    "You are a helpful restaurant assistant. Answer the following question in a friendly and informative way.\n"
+    "Keep your response concise and relevant. If the question is about food, cuisine, or restaurants, provide helpful information.\n"
+    "If you don't know something specific, it's okay to say so."
+)
+
+# Gemini API key, read once at import (after the .env file is loaded)
+_GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+
+@lru_cache(maxsize=1)
+def _qna_model():
+    """Gemini model for Q&A mode, configured on first use"""
+    genai.configure(api_key=_GEMINI_API_KEY)
+    return genai.GenerativeModel('gemini-1.5-flash', system_instruction=_QNA_SYSTEM_INSTRUCTION)
+
+# Gemini answers keyed by normalised question, least recently used first
+_QNA_ANSWER_CACHE_SIZE = 1024
+_qna_answer_cache = OrderedDict()
+_qna_answer_cache_lock = threading.Lock()
+
+# Accepted question length in characters for Q&A mode
+_QNA_MIN_QUESTION_LENGTH = 3
+_QNA_MAX_QUESTION_LENGTH = 8192
+
 class RestaurantIntelligenceAgent:
     """Main chatbot service class for handling restaurant intelligence queries"""
     
+    # last_workflow_results is only set once an AI Agent workflow has run
+    __slots__ = ('nutrition_service', 'ai_agent', 'mode', 'intelligence_mode', 'current_workflow', 'last_workflow_results')
+    
     def __init__(self):
         self.nutrition_service = USDANutritionService()
         self.ai_agent = AutoGenRestaurantAI()  # Initialize AI Agent
@@ -45,39 +771,20 @@ class RestaurantIntelligenceAgent:
         """Process incoming message and determine appropriate response"""
         message_lower = message.lower()
         
-        # Debug logging to file with UTF-8 encoding
-        try:
-            with open('C:\\Users\\User\\Desktop\\first-app\\debug_log.txt', 'a', encoding='utf-8') as f:
-                f.write(f"DEBUG: Processing message: '{message}'\n")
-                f.write(f"DEBUG: Message lower: '{message_lower}'\n")
-                f.write(f"DEBUG: Workflow details check: {'workflow details' in message_lower}\n")
-                f.write(f"DEBUG: Show workflow details check: {'show workflow details' in message_lower}\n")
-                f.flush()
-        except Exception as e:
-            pass
-        
         # Update intelligence mode if provided
         if intelligence_mode:
             self.intelligence_mode = intelligence_mode
         
         # Check for workflow details command
         if 'workflow details' in message_lower or 'show workflow details' in message_lower:
-            print("DEBUG: Routing to workflow details handler")
+            logger.debug("Routing to workflow details handler")
             return self._handle_workflow_details_request()
         
         # Check for AI agent workflow commands (check original message first)
-        # Log safely without Unicode characters
-        safe_message = message.encode('ascii', 'ignore').decode('ascii') if message else 'empty'
-        safe_message_lower = message_lower.encode('ascii', 'ignore').decode('ascii') if message_lower else 'empty'
-        logging.info(f"DEBUG: Processing message: {safe_message[:50]}...")
-        logging.info(f"DEBUG: Message lower: {safe_message_lower[:50]}...")
-        logging.info(f"DEBUG: AI agent check: {'ai agent' in message_lower}")
-        logging.info(f"DEBUG: Auto apply check: {'auto apply recipe' in message_lower}")
-        logging.info(f"DEBUG: Automated workflow check: {'automated workflow' in message_lower}")
-        logging.info(f"DEBUG: Workflow execution check: {'workflow execution' in message_lower}")
+        logger.debug("Processing message: %.50s...", message or 'empty')
         
         if 'ai agent' in message_lower or 'auto apply recipe' in message_lower or 'automated workflow' in message_lower or 'workflow execution' in message_lower:
-            logging.info("DEBUG: Routing to AI agent workflow")
+            logger.debug("Routing to AI agent workflow")
             self.mode = 'ai_agent'
             return self._handle_ai_agent_workflow(message)
         
@@ -161,15 +868,8 @@ class RestaurantIntelligenceAgent:
     def _handle_chat_message(self, message, context, category=None):
         """Handle regular chat messages with mode restrictions"""
         try:
-            # Log safely without Unicode characters
-            safe_message = message.encode('ascii', 'ignore').decode('ascii') if message else 'empty'
             message_lower = message.lower()
-            safe_message_lower = message_lower.encode('ascii', 'ignore').decode('ascii') if message_lower else 'empty'
-            logger.info(f"DEBUG: Processing message: {safe_message[:50]}...")
-            logger.info(f"DEBUG: Message lower: {safe_message_lower[:50]}...")
-            logger.info(f"DEBUG: AI agent check: {'ai agent' in message_lower}")
-            logger.info(f"DEBUG: Auto apply check: {'auto apply' in message_lower}")
-            logger.info(f"DEBUG: Recipe check: {'recipe' in message_lower}")
+            logger.debug("Processing chat message: %.50s...", message or 'empty')
             
             # Check if user is trying to access mode-specific functionality without being in that mode
             if self.intelligence_mode != 'INNOVATION' and any(word in message_lower for word in ['surplus recipe', 'flavor pairing', 'seasonal menu']):
@@ -300,7 +1000,8 @@ class RestaurantIntelligenceAgent:
                 return dish_category_result
             
             # Check if user is asking for dish suggestions
-            if any(word in message.lower() for word in ['suggest', 'suggestion', 'recommend', 'idea', 'what should', 'what can', 'give me']):
+            message_lower = message.lower()
+            if any(word in message_lower for word in ['suggest', 'suggestion', 'recommend', 'idea', 'what should', 'what can', 'give me']):
                 return self._generate_four_category_suggestions(message)
             
             menu_items = MenuItem.query.limit(10).all()
@@ -647,9 +1348,6 @@ class RestaurantIntelligenceAgent:
     def _run_demand_automation(self):
         """Run item-specific demand forecasting automation"""
         try:
-            from services.unified_restaurant_demand_system import RestaurantDemandPredictor
-            from models import MenuItem
-            
             # Initialize the unified predictor
             data_path = "C:/Users/User/Desktop/first-app/instance/cleaned_streamlined_ultimate_malaysian_data.csv"
             predictor = RestaurantDemandPredictor(data_path)
@@ -772,7 +1470,7 @@ class RestaurantIntelligenceAgent:
                 
                 # Check which ingredients are mentioned in the message
                 for ingredient in available_ingredients:
-                    if ingredient.name.lower() in message.lower():
+                    if ingredient.name.lower() in message_lower:
                         ingredients_mentioned.append(ingredient.name)
                 
                 if ingredients_mentioned:
@@ -863,47 +1561,11 @@ class RestaurantIntelligenceAgent:
                     }
             
             elif 'flavor pairing' in message:
-                pairings = [
-                    {"base": "Chocolate", "pair": "Chili", "result": "Spicy Chocolate Dessert"},
-                    {"base": "Watermelon", "pair": "Feta Cheese", "result": "Mediterranean Summer Salad"},
-                    {"base": "Coffee", "pair": "Cardamom", "result": "Arabic-Inspired Coffee Blend"}
-                ]
-                
-                selected_pairing = pairings[0]  # In real implementation, this would be more sophisticated
-                
-                return {
-                    'response': f"🎨 **INNOVATION MODE - Flavor Pairing**\n\n**Unique Combination:** {selected_pairing['base']} + {selected_pairing['pair']}\n\n**Creative Result:** {selected_pairing['result']}\n\n**Why it works:** Contrasting flavors create memorable taste experiences",
-                    'type': 'flavor_pairing',
-                    'data': {
-                        'mode': 'INNOVATION',
-                        'pairing': selected_pairing,
-                        'ui_update': 'highlight_new_recipe'
-                    }
-                }
+                # In real implementation, pairing selection would be more sophisticated
+                return _flavor_pairing_payload(0)
             
             elif 'seasonal' in message:
-                from datetime import datetime
-                current_month = datetime.now().month
-                
-                if current_month in [12, 1, 2]:  # Winter
-                    seasonal_idea = "❄️ **Winter Warmth Bowl** - Roasted root vegetables with spiced quinoa"
-                elif current_month in [3, 4, 5]:  # Spring
-                    seasonal_idea = "🌸 **Spring Renewal Salad** - Fresh greens with edible flowers"
-                elif current_month in [6, 7, 8]:  # Summer
-                    seasonal_idea = "☀️ **Summer Chill Gazpacho** - Cold vegetable soup with herb oil"
-                else:  # Fall
-                    seasonal_idea = "🍂 **Autumn Harvest Risotto** - Pumpkin and sage risotto"
-                
-                return {
-                    'response': f"🍃 **INNOVATION MODE - Seasonal Menu**\n\n{seasonal_idea}\n\n**Seasonal Strategy:** Align menu with natural ingredient availability and customer mood",
-                    'type': 'seasonal_innovation',
-                    'data': {
-                        'mode': 'INNOVATION',
-                        'new_idea': seasonal_idea,
-                        'season': ['Winter', 'Spring', 'Summer', 'Fall'][current_month//3 if current_month != 12 else 0],
-                        'ui_update': 'highlight_new_recipe'
-                    }
-                }
+                return _seasonal_payload(datetime.now().month)
             
             else:
                 return {
@@ -958,14 +1620,9 @@ class RestaurantIntelligenceAgent:
             
             # Calculate overall compatibility score
             if len(ingredients) >= 2:
-                # Simple compatibility based on complementary nutritional profiles
-                total_protein = sum(analysis['nutritional_balance'][ing]['protein'] for ing in analysis['nutritional_balance'])
-                total_carbs = sum(analysis['nutritional_balance'][ing]['carbs'] for ing in analysis['nutritional_balance'])
-                total_fat = sum(analysis['nutritional_balance'][ing]['fat'] for ing in analysis['nutritional_balance'])
-                
-                # Balanced nutrition gets higher compatibility score
-                balance_score = 100 - abs(33.3 - (total_protein / (total_protein + total_carbs + total_fat + 0.1) * 100))
-                analysis['compatibility_score'] = min(max(balance_score, 0), 100)
+                # Simple compatibility based on complementary nutritional profiles;
+                # balanced nutrition gets a higher compatibility score
+                analysis['compatibility_score'] = _nutrition_balance_score(analysis['nutritional_balance'])
             
             return analysis
             
@@ -1006,65 +1663,58 @@ class RestaurantIntelligenceAgent:
             logger.error(f"Error generating creative suggestions: {str(e)}")
             return [f"1. **Creative {ingredients[0].title()} Dish** - Innovative recipe featuring {', '.join(ingredients)}"]
     
-    def _create_realistic_dishes(self, primary_ingredient, secondary_ingredients):
+    def _generate_dish_names(self, dish_endings, count=3):
+        """Generate creative dish names using one batched draw per naming pool"""
+        return [f'{adjective} {word} {ending}' for adjective, word, ending in zip(
+            random.choices(_POETIC_ADJECTIVES, k=count),
+            random.choices(_DESCRIPTIVE_WORDS, k=count),
+            random.choices(dish_endings, k=count)
+        )]
+    
+    def _create_realistic_dishes(self, primary_ingredient, secondary_ingredients, category=None):
         """Create realistic dish suggestions based on ingredient combinations"""
         dishes = []
         
-        import random
-        
-        # Creative naming components
-        poetic_adjectives = ["Crimson", "Aurora", "Citrus", "Velvet", "Golden", "Sapphire", "Emerald", "Moonlit", "Starlit", "Twilight", "Dawn", "Sunset", "Mystic", "Ethereal", "Silken", "Crystal", "Pearl", "Amber", "Rose", "Lavender"]
-        descriptive_words = ["Drift", "Mist", "Ember", "Whisper", "Echo", "Dream", "Melody", "Symphony", "Harmony", "Cascade", "Breeze", "Glow", "Shimmer", "Sparkle", "Bloom", "Blossom", "Essence", "Spirit", "Soul", "Heart"]
-        
-        # Category-specific dish endings
-        if category == "Main Course":
-            dish_endings = ["Medallion", "Wellington", "Roulade", "Confit", "Braise", "Gratin", "Casserole", "Steak", "Filet", "Roast", "Chop", "Cutlet"]
-        elif category == "Beverage":
-            dish_endings = ["Fizz", "Elixir", "Brew", "Infusion", "Tonic", "Refresher", "Cooler", "Spritz", "Smoothie", "Latte", "Mocktail", "Blend"]
-        elif category == "Dessert":
-            dish_endings = ["Tart", "Soufflé", "Mousse", "Parfait", "Galette", "Compote", "Reduction", "Crème", "Cake", "Pudding", "Truffle", "Gelato"]
-        elif category == "Side Dish":
-            dish_endings = ["Medley", "Sauté", "Pilaf", "Gratin", "Salad", "Slaw", "Relish", "Chutney", "Puree", "Hash", "Chips", "Crisps"]
-        else:
-            dish_endings = ["Tart", "Noodles", "Fizz", "Soufflé", "Risotto", "Bisque", "Mousse", "Parfait", "Galette", "Terrine", "Compote", "Reduction", "Infusion", "Medley", "Symphony", "Rhapsody", "Serenade", "Delight", "Fantasy"]
+        # Creative names for the three suggested dishes
+        dish_names = self._generate_dish_names(_DISH_ENDINGS.get(category, _DEFAULT_DISH_ENDINGS))
         
         # Common ingredient-based dish patterns with creative names
         if 'chicken' in primary_ingredient or any('chicken' in ing for ing in secondary_ingredients):
             dishes.extend([
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Tender grilled chicken breast seasoned with herbs and served with roasted vegetables'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Quick-cooked chicken with fresh vegetables in a savory sauce over steamed rice'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Crispy romaine lettuce topped with grilled chicken, parmesan cheese, and classic Caesar dressing'}
+                {'name': dish_names[0], 'description': 'Tender grilled chicken breast seasoned with herbs and served with roasted vegetables'},
+                {'name': dish_names[1], 'description': 'Quick-cooked chicken with fresh vegetables in a savory sauce over steamed rice'},
+                {'name': dish_names[2], 'description': 'Crispy romaine lettuce topped with grilled chicken, parmesan cheese, and classic Caesar dressing'}
             ])
         elif 'beef' in primary_ingredient or any('beef' in ing for ing in secondary_ingredients):
             dishes.extend([
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Perfectly grilled beef steak cooked to your preference with garlic butter and seasonal sides'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Tender beef strips with crisp vegetables in a rich brown sauce served over noodles'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Seasoned ground beef in soft tortillas with fresh toppings and zesty salsa'}
+                {'name': dish_names[0], 'description': 'Perfectly grilled beef steak cooked to your preference with garlic butter and seasonal sides'},
+                {'name': dish_names[1], 'description': 'Tender beef strips with crisp vegetables in a rich brown sauce served over noodles'},
+                {'name': dish_names[2], 'description': 'Seasoned ground beef in soft tortillas with fresh toppings and zesty salsa'}
             ])
         elif 'salmon' in primary_ingredient or any('salmon' in ing for ing in secondary_ingredients):
             dishes.extend([
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Fresh salmon fillet baked with lemon and herbs, served with quinoa and steamed broccoli'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Glazed salmon with sweet teriyaki sauce, served with jasmine rice and Asian vegetables'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Flaked salmon over mixed greens with avocado, cucumber, and citrus vinaigrette'}
+                {'name': dish_names[0], 'description': 'Fresh salmon fillet baked with lemon and herbs, served with quinoa and steamed broccoli'},
+                {'name': dish_names[1], 'description': 'Glazed salmon with sweet teriyaki sauce, served with jasmine rice and Asian vegetables'},
+                {'name': dish_names[2], 'description': 'Flaked salmon over mixed greens with avocado, cucumber, and citrus vinaigrette'}
             ])
         elif 'pasta' in primary_ingredient or any('pasta' in ing for ing in secondary_ingredients):
             dishes.extend([
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Classic Italian pasta with eggs, cheese, pancetta, and black pepper in a creamy sauce'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Penne pasta in a spicy tomato sauce with garlic, red peppers, and fresh basil'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Rich and creamy fettuccine pasta with parmesan cheese and butter sauce'}
+                {'name': dish_names[0], 'description': 'Classic Italian pasta with eggs, cheese, pancetta, and black pepper in a creamy sauce'},
+                {'name': dish_names[1], 'description': 'Penne pasta in a spicy tomato sauce with garlic, red peppers, and fresh basil'},
+                {'name': dish_names[2], 'description': 'Rich and creamy fettuccine pasta with parmesan cheese and butter sauce'}
             ])
         elif 'rice' in primary_ingredient or any('rice' in ing for ing in secondary_ingredients):
             dishes.extend([
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Wok-fried rice with vegetables, eggs, and your choice of protein in savory soy sauce'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Aromatic basmati rice cooked with herbs, spices, and toasted almonds'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Healthy bowl with seasoned rice, fresh vegetables, and protein of your choice'}
+                {'name': dish_names[0], 'description': 'Wok-fried rice with vegetables, eggs, and your choice of protein in savory soy sauce'},
+                {'name': dish_names[1], 'description': 'Aromatic basmati rice cooked with herbs, spices, and toasted almonds'},
+                {'name': dish_names[2], 'description': 'Healthy bowl with seasoned rice, fresh vegetables, and protein of your choice'}
             ])
         else:
             # Generic dishes for other ingredient combinations
             dishes.extend([
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': f'Fresh {primary_ingredient} with {" and ".join(secondary_ingredients[:2])} in a savory sauce'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': f'Healthy salad featuring {primary_ingredient} with {" and ".join(secondary_ingredients[:2])} and house dressing'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': f'Hearty soup with {primary_ingredient} and {" and ".join(secondary_ingredients[:2])} in a flavorful broth'}
+                {'name': dish_names[0], 'description': f'Fresh {primary_ingredient} with {" and ".join(secondary_ingredients[:2])} in a savory sauce'},
+                {'name': dish_names[1], 'description': f'Healthy salad featuring {primary_ingredient} with {" and ".join(secondary_ingredients[:2])} and house dressing'},
+                {'name': dish_names[2], 'description': f'Hearty soup with {primary_ingredient} and {" and ".join(secondary_ingredients[:2])} in a flavorful broth'}
             ])
         
         return dishes
@@ -1073,36 +1723,32 @@ class RestaurantIntelligenceAgent:
         """Create dish suggestions for a single ingredient"""
         dishes = []
         
-        import random
-        
-        # Creative naming components
-        poetic_adjectives = ["Crimson", "Aurora", "Citrus", "Velvet", "Golden", "Sapphire", "Emerald", "Moonlit", "Starlit", "Twilight", "Dawn", "Sunset", "Mystic", "Ethereal", "Silken", "Crystal", "Pearl", "Amber", "Rose", "Lavender"]
-        descriptive_words = ["Drift", "Mist", "Ember", "Whisper", "Echo", "Dream", "Melody", "Symphony", "Harmony", "Cascade", "Breeze", "Glow", "Shimmer", "Sparkle", "Bloom", "Blossom", "Essence", "Spirit", "Soul", "Heart"]
-        dish_endings = ["Tart", "Noodles", "Fizz", "Soufflé", "Risotto", "Bisque", "Mousse", "Parfait", "Galette", "Terrine", "Compote", "Reduction", "Infusion", "Medley", "Symphony", "Rhapsody", "Serenade", "Delight", "Fantasy"]
+        # Creative names for the three suggested dishes
+        dish_names = self._generate_dish_names(_DEFAULT_DISH_ENDINGS)
         
         if 'chicken' in main_ingredient:
             dishes = [
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Whole roasted chicken with herbs and spices, served with mashed potatoes and gravy'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Breaded chicken breast topped with marinara sauce and melted mozzarella cheese'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Comforting chicken soup with vegetables and noodles in a rich broth'}
+                {'name': dish_names[0], 'description': 'Whole roasted chicken with herbs and spices, served with mashed potatoes and gravy'},
+                {'name': dish_names[1], 'description': 'Breaded chicken breast topped with marinara sauce and melted mozzarella cheese'},
+                {'name': dish_names[2], 'description': 'Comforting chicken soup with vegetables and noodles in a rich broth'}
             ]
         elif 'beef' in main_ingredient:
             dishes = [
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Juicy beef patty with lettuce, tomato, and cheese on a toasted bun'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Slow-cooked beef stew with potatoes, carrots, and onions in a rich gravy'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Grilled beef skewers with bell peppers and onions, served with rice'}
+                {'name': dish_names[0], 'description': 'Juicy beef patty with lettuce, tomato, and cheese on a toasted bun'},
+                {'name': dish_names[1], 'description': 'Slow-cooked beef stew with potatoes, carrots, and onions in a rich gravy'},
+                {'name': dish_names[2], 'description': 'Grilled beef skewers with bell peppers and onions, served with rice'}
             ]
         elif 'salmon' in main_ingredient:
             dishes = [
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Fresh salmon grilled to perfection with lemon and dill'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'Fresh salmon sashimi and nigiri with wasabi and pickled ginger'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': 'House-smoked salmon served with cream cheese and capers on bagel'}
+                {'name': dish_names[0], 'description': 'Fresh salmon grilled to perfection with lemon and dill'},
+                {'name': dish_names[1], 'description': 'Fresh salmon sashimi and nigiri with wasabi and pickled ginger'},
+                {'name': dish_names[2], 'description': 'House-smoked salmon served with cream cheese and capers on bagel'}
             ]
         else:
             dishes = [
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': f'Perfectly grilled {main_ingredient} with seasonal herbs and spices'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': f'Aromatic curry featuring {main_ingredient} in a rich and flavorful sauce'},
-                {'name': f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(dish_endings)}', 'description': f'Fresh salad with {main_ingredient} and mixed greens with house dressing'}
+                {'name': dish_names[0], 'description': f'Perfectly grilled {main_ingredient} with seasonal herbs and spices'},
+                {'name': dish_names[1], 'description': f'Aromatic curry featuring {main_ingredient} in a rich and flavorful sauce'},
+                {'name': dish_names[2], 'description': f'Fresh salad with {main_ingredient} and mixed greens with house dressing'}
             ]
         
         return dishes
@@ -1115,91 +1761,35 @@ class RestaurantIntelligenceAgent:
         if not ingredient_names:
             return []
         
-        import random
+        lowered_names = {name: name.lower() for name in ingredient_names}
         
-        # Creative naming components
-        poetic_adjectives = ["Crimson", "Aurora", "Citrus", "Velvet", "Golden", "Sapphire", "Emerald", "Moonlit", "Starlit", "Twilight", "Dawn", "Sunset", "Mystic", "Ethereal", "Silken", "Crystal", "Pearl", "Amber", "Rose", "Lavender"]
-        descriptive_words = ["Drift", "Mist", "Ember", "Whisper", "Echo", "Dream", "Melody", "Symphony", "Harmony", "Cascade", "Breeze", "Glow", "Shimmer", "Sparkle", "Bloom", "Blossom", "Essence", "Spirit", "Soul", "Heart"]
+        # Ingredients for each category dish: up to three distinct names, rotating
+        # the starting point through the available ingredients per category
+        name_count = len(ingredient_names)
+        selections = [
+            list(dict.fromkeys(ingredient_names[(i + offset) % name_count] for offset in range(min(name_count, 3))))
+            for i in range(len(_INVENTORY_DISH_CATEGORIES))
+        ]
         
-        # Category-specific dish endings and descriptions
-        categories = {
-            'Main Course': {
-                'emoji': '🍽️',
-                'endings': ["Wellington", "Medallion", "Roulade", "Confit", "Braise", "Gratin", "Casserole", "Filet", "Roast", "Chop"],
-                'description_templates': [
-                    'A sophisticated main course featuring {ingredients} with modern culinary techniques and aromatic spices',
-                    'An innovative fusion entrée combining {ingredients} creating a perfect balance of flavors and textures',
-                    'A chef\'s signature main dish showcasing {ingredients} with creative presentation and bold flavor profiles'
-                ]
-            },
-            'Beverage': {
-                'emoji': '🥤',
-                'endings': ["Fizz", "Elixir", "Brew", "Infusion", "Tonic", "Refresher", "Cooler", "Spritz", "Smoothie", "Blend"],
-                'description_templates': [
-                    'A refreshing beverage infused with {ingredients} and complementary botanicals for a unique taste experience',
-                    'An artisanal drink creation featuring {ingredients} with innovative preparation and signature flavors',
-                    'A creative beverage blend highlighting {ingredients} with unexpected flavor combinations and aromatic notes'
-                ]
-            },
-            'Dessert': {
-                'emoji': '🍰',
-                'endings': ["Tart", "Soufflé", "Mousse", "Parfait", "Galette", "Compote", "Crème", "Cake", "Pudding", "Truffle"],
-                'description_templates': [
-                    'A decadent dessert creation featuring {ingredients} with elegant presentation and luxurious textures',
-                    'An innovative sweet finale showcasing {ingredients} with modern pastry techniques and artistic flair',
-                    'A sophisticated dessert masterpiece highlighting {ingredients} with creative preparation and indulgent flavors'
-                ]
-            },
-            'Side Dish': {
-                'emoji': '🥗',
-                'endings': ["Medley", "Risotto", "Salad", "Gratin", "Sauté", "Pilaf", "Compote", "Reduction", "Terrine", "Relish"],
-                'description_templates': [
-                    'A vibrant side dish featuring {ingredients} with seasonal accompaniments and fresh herbs',
-                    'An artisanal accompaniment showcasing {ingredients} with innovative cooking techniques and complementary flavors',
-                    'A creative side creation highlighting {ingredients} with modern preparation and colorful presentation'
-                ]
-            }
-        }
+        # Draw all adjectives and descriptors for the four dishes at once
+        adjectives = random.choices(_POETIC_ADJECTIVES, k=len(_INVENTORY_DISH_CATEGORIES))
+        descriptors = random.choices(_DESCRIPTIVE_WORDS, k=len(_INVENTORY_DISH_CATEGORIES))
         
         # Create exactly 4 dishes, one from each category
-        category_names = list(categories.keys())
-        
-        for i, category_name in enumerate(category_names):
-            category_data = categories[category_name]
-            
-            # Select ingredients for this dish (rotate through available ingredients)
-            if len(ingredient_names) >= 2:
-                # Use different ingredient combinations for each category
-                start_idx = i % len(ingredient_names)
-                selected_ingredients = []
-                
-                # Add primary ingredient
-                selected_ingredients.append(ingredient_names[start_idx])
-                
-                # Add secondary ingredient if available
-                if len(ingredient_names) > 1:
-                    secondary_idx = (start_idx + 1) % len(ingredient_names)
-                    if ingredient_names[secondary_idx] not in selected_ingredients:
-                        selected_ingredients.append(ingredient_names[secondary_idx])
-                
-                # Add third ingredient for variety if available
-                if len(ingredient_names) > 2 and len(selected_ingredients) < 3:
-                    tertiary_idx = (start_idx + 2) % len(ingredient_names)
-                    if ingredient_names[tertiary_idx] not in selected_ingredients:
-                        selected_ingredients.append(ingredient_names[tertiary_idx])
-            else:
-                selected_ingredients = [ingredient_names[0]]
+        for i, (category_name, category_data) in enumerate(_INVENTORY_DISH_CATEGORIES.items()):
+            selected_ingredients = selections[i]
+            selected_lower = [lowered_names[name] for name in selected_ingredients]
             
             # Format ingredients for description
-            if len(selected_ingredients) == 1:
-                ingredients_text = selected_ingredients[0].lower()
-            elif len(selected_ingredients) == 2:
-                ingredients_text = f"{selected_ingredients[0].lower()} and {selected_ingredients[1].lower()}"
+            if len(selected_lower) == 1:
+                ingredients_text = selected_lower[0]
+            elif len(selected_lower) == 2:
+                ingredients_text = f"{selected_lower[0]} and {selected_lower[1]}"
             else:
-                ingredients_text = f"{', '.join([ing.lower() for ing in selected_ingredients[:-1]])}, and {selected_ingredients[-1].lower()}"
+                ingredients_text = f"{', '.join(selected_lower[:-1])}, and {selected_lower[-1]}"
             
             # Create dish name and description
-            dish_name = f'{random.choice(poetic_adjectives)} {random.choice(descriptive_words)} {random.choice(category_data["endings"])}'
+            dish_name = f'{adjectives[i]} {descriptors[i]} {random.choice(category_data["endings"])}'
             description = random.choice(category_data['description_templates']).format(ingredients=ingredients_text)
             
             dishes.append({
@@ -1215,18 +1805,26 @@ class RestaurantIntelligenceAgent:
     def _generate_ai_recipe_suggestions(self, message, category=None):
         """Generate comprehensive AI-powered recipe suggestions with inventory integration"""
         try:
-            # Extract ingredients from message
-            ingredients_mentioned = []
-            available_ingredients = Ingredient.query.all()
+            message_lower = message.lower()
             
-            for ingredient in available_ingredients:
-                if ingredient.name.lower() in message.lower():
-                    ingredients_mentioned.append(ingredient.name)
+            # Extract ingredients from message
+            ingredients_mentioned = list(_mentioned_ingredient_names(_ingredient_names_version, message_lower))
             
             # If no specific ingredients mentioned, show inventory-based suggestions
             if not ingredients_mentioned:
-                # Get current inventory with stock levels
-                inventory_items = InventoryItem.query.join(Ingredient).filter(InventoryItem.quantity > 0).all()
+                # Get current inventory bucketed by stock level (0 = high >20, 1 = medium >5,
+                # 2 = low) and ordered by level then quantity, with the ingredient in the same query;
+                # the quantity is also selected as a float so rows need no Decimal conversion
+                stock_level = case(
+                    (InventoryItem.quantity > 20, 0),
+                    (InventoryItem.quantity > 5, 1),
+                    else_=2
+                ).label('stock_level')
+                inventory_items = db.session.query(
+                    Ingredient, cast(InventoryItem.quantity, Float).label('quantity'), stock_level
+                ).select_from(InventoryItem).join(
+                    Ingredient, InventoryItem.ingredient_id == Ingredient.id
+                ).filter(InventoryItem.quantity > 0).order_by(stock_level, InventoryItem.quantity.desc()).all()
                 
                 if not inventory_items:
                     return {
@@ -1237,64 +1835,46 @@ class RestaurantIntelligenceAgent:
                         }
                     }
                 
-                # Categorize inventory by stock levels
-                high_stock_items = []
-                medium_stock_items = []
-                low_stock_items = []
-                
-                for item in inventory_items:
-                    ingredient = Ingredient.query.get(item.ingredient_id)
-                    if ingredient:
-                        inventory_data = {
-                            'name': ingredient.name,
-                            'quantity': float(item.quantity),
-                            'unit': ingredient.unit,
-                            'category': ingredient.category
-                        }
-                        
-                        if item.quantity > 20:
-                            high_stock_items.append(inventory_data)
-                        elif item.quantity > 5:
-                            medium_stock_items.append(inventory_data)
-                        else:
-                            low_stock_items.append(inventory_data)
-                
-                # Sort by quantity (highest first)
-                high_stock_items.sort(key=lambda x: x['quantity'], reverse=True)
-                medium_stock_items.sort(key=lambda x: x['quantity'], reverse=True)
-                low_stock_items.sort(key=lambda x: x['quantity'], reverse=True)
+                # Split the already sorted rows into stock levels (highest quantity first)
+                stock_buckets = ([], [], [])
+                for level, rows in groupby(inventory_items, key=attrgetter('stock_level')):
+                    stock_buckets[level].extend({
+                        'name': ingredient.name,
+                        'quantity': quantity,
+                        'unit': ingredient.unit,
+                        'category': ingredient.category
+                    } for ingredient, quantity, _ in rows)
+                high_stock_items, medium_stock_items, low_stock_items = stock_buckets
+                
+                high_top = high_stock_items[:8]
+                medium_top = medium_stock_items[:7]
+                low_top = low_stock_items[:4]
                 
                 # Build inventory display response
-                response = "💡 **AI Recipe Engine**\n\nI can suggest creative recipes based on your current inventory!\n\n📦 **Current Inventory:**\n\n"
-                
-                if high_stock_items:
-                    response += "🟢 **High Stock (>20 units):**\n"
-                    for item in high_stock_items[:8]:  # Show top 8
-                        response += f"• {item['name']}: {item['quantity']:.0f} {item['unit']}\n"
-                    response += "\n"
-                
-                if medium_stock_items:
-                    response += "🟡 **Medium Stock (6-20 units):**\n"
-                    for item in medium_stock_items[:6]:  # Show top 6
-                        response += f"• {item['name']}: {item['quantity']:.0f} {item['unit']}\n"
-                    response += "\n"
-                
-                if low_stock_items:
-                    response += "🔴 **Low Stock (≤5 units):**\n"
-                    for item in low_stock_items[:4]:  # Show top 4
-                        response += f"• {item['name']}: {item['quantity']:.0f} {item['unit']}\n"
-                    response += "\n"
+                parts = ["💡 **AI Recipe Engine**\n\nI can suggest creative recipes based on your current inventory!\n\n📦 **Current Inventory:**\n\n"]
+                
+                stock_blocks = (
+                    ("🟢 **High Stock (>20 units):**\n", high_top, 8),
+                    ("🟡 **Medium Stock (6-20 units):**\n", medium_top, 6),
+                    ("🔴 **Low Stock (≤5 units):**\n", low_top, 4)
+                )
+                for header, items, limit in stock_blocks:
+                    if not items:
+                        continue
+                    parts.append(header)
+                    parts.extend(f"• {item['name']}: {item['quantity']:.0f} {item['unit']}\n" for item in items[:limit])
+                    parts.append("\n")
                 
                 # Add suggested combinations with category highlighting
-                response += "💡 **Suggested Combinations:**\n"
+                parts.append("💡 **Suggested Combinations:**\n")
                 suggestions = []
                 
                 # Generate four category-specific dish suggestions
-                available_ingredients = high_stock_items + medium_stock_items
+                available_ingredients = high_top + medium_top
                 if available_ingredients:
                     dish_suggestions = self._create_inventory_based_dishes(available_ingredients[:7])
                     for dish in dish_suggestions:
-                        response += f"• **{dish['emoji']} {dish['category']}:** {dish['name']} - {dish['description']}\n"
+                        parts.append(f"• **{dish['emoji']} {dish['category']}:** {dish['name']} - {dish['description']}\n")
                         suggestions.append({
                             'text': dish['name'],
                             'description': dish['description'],
@@ -1304,15 +1884,15 @@ class RestaurantIntelligenceAgent:
                             'type': 'realistic_dish'
                         })
                 
-                response += "\n**How to use:**\n"
-                response += "• Simply mention ingredients from your inventory\n"
-                if high_stock_items:
-                    response += f"• Example: \"Create a dish with {high_stock_items[0]['name']} and {high_stock_items[1]['name'] if len(high_stock_items) > 1 else 'vegetables'}\"\n"
-                response += "• Or say: \"Suggest recipes using high stock ingredients\"\n"
-                response += "• Click on any suggestion below to get started!"
+                parts.append("\n**How to use:**\n")
+                parts.append("• Simply mention ingredients from your inventory\n")
+                if high_top:
+                    parts.append(f"• Example: \"Create a dish with {high_top[0]['name']} and {high_top[1]['name'] if len(high_top) > 1 else 'vegetables'}\"\n")
+                parts.append("• Or say: \"Suggest recipes using high stock ingredients\"\n")
+                parts.append("• Click on any suggestion below to get started!")
                 
                 return {
-                    'response': response,
+                    'response': "".join(parts),
                     'type': 'ai_recipe_engine',
                     'data': {
                         'mode': 'INNOVATION',
@@ -1331,37 +1911,37 @@ class RestaurantIntelligenceAgent:
             suggestions = self._generate_creative_suggestions(ingredients_mentioned, analysis)
             
             # Generate detailed response
-            response = f"🤖 **AI-Powered Recipe Suggestions**\n\n"
-            response += f"**Ingredients Analyzed:** {', '.join(ingredients_mentioned)}\n"
-            response += f"**Compatibility Score:** {analysis['compatibility_score']:.0f}%\n\n"
+            parts = [f"🤖 **AI-Powered Recipe Suggestions**\n\n"]
+            parts.append(f"**Ingredients Analyzed:** {', '.join(ingredients_mentioned)}\n")
+            parts.append(f"**Compatibility Score:** {analysis['compatibility_score']:.0f}%\n\n")
             
             # Add availability information
             if analysis['availability_status']:
-                response += "**📦 Ingredient Availability:**\n"
+                parts.append("**📦 Ingredient Availability:**\n")
                 for ingredient, status in analysis['availability_status'].items():
                     status_emoji = "🟢" if status['status'] == 'high' else "🟡" if status['status'] == 'medium' else "🔴"
-                    response += f"• {status_emoji} {ingredient.title()}: {status['quantity']} units ({status['status']})\n"
-                response += "\n"
+                    parts.append(f"• {status_emoji} {ingredient.title()}: {status['quantity']} units ({status['status']})\n")
+                parts.append("\n")
             
             # Add popularity metrics
             if analysis['popularity_metrics']:
-                response += "**📈 Popularity Analysis:**\n"
+                parts.append("**📈 Popularity Analysis:**\n")
                 for ingredient, metrics in analysis['popularity_metrics'].items():
-                    response += f"• {ingredient.title()}: {metrics['popularity_score']:.0f}% popularity (used in {metrics['menu_usage_count']} menu items)\n"
-                response += "\n"
+                    parts.append(f"• {ingredient.title()}: {metrics['popularity_score']:.0f}% popularity (used in {metrics['menu_usage_count']} menu items)\n")
+                parts.append("\n")
             
             # Add AI suggestions
-            response += "**🎨 AI-Generated Recipes:**\n"
+            parts.append("**🎨 AI-Generated Recipes:**\n")
             for i, suggestion in enumerate(suggestions[:4], 1):  # Limit to top 4
-                response += f"{i}. {suggestion}\n"
+                parts.append(f"{i}. {suggestion}\n")
             
-            response += "\n**💡 Next Steps:**\n"
-            response += "• Say 'auto apply [recipe name]' to automatically generate complete dish details\n"
-            response += "• Say 'manual input' to add your own custom recipe\n"
-            response += "• Say 'regenerate appetizer' to focus on specific dish types"
+            parts.append("\n**💡 Next Steps:**\n")
+            parts.append("• Say 'auto apply [recipe name]' to automatically generate complete dish details\n")
+            parts.append("• Say 'manual input' to add your own custom recipe\n")
+            parts.append("• Say 'regenerate appetizer' to focus on specific dish types")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'ai_recipe_suggestions',
                 'data': {
                     'mode': 'INNOVATION',
@@ -1383,63 +1963,36 @@ class RestaurantIntelligenceAgent:
     def _handle_auto_apply_mode(self, message):
         """Handle Auto Apply functionality with AI agent framework"""
         try:
-            response = "🤖 **Auto Apply Mode Activated**\n\n"
-            response += "**AI Agent Framework Features:**\n"
-            response += "• 🖼️ **Image Generation**: High-quality food photography\n"
-            response += "• 📊 **Demand Prediction**: Historical data analysis\n"
-            response += "• 💰 **Optimal Pricing**: Market-based pricing strategy\n"
-            response += "• 🥗 **Nutrition Calculation**: Complete nutritional profile\n"
-            response += "• 📝 **Dish Compilation**: Full menu item details\n\n"
+            message_lower = message.lower()
+            
+            parts = ["🤖 **Auto Apply Mode Activated**\n\n"]
+            parts.append("**AI Agent Framework Features:**\n")
+            parts.append("• 🖼️ **Image Generation**: High-quality food photography\n")
+            parts.append("• 📊 **Demand Prediction**: Historical data analysis\n")
+            parts.append("• 💰 **Optimal Pricing**: Market-based pricing strategy\n")
+            parts.append("• 🥗 **Nutrition Calculation**: Complete nutritional profile\n")
+            parts.append("• 📝 **Dish Compilation**: Full menu item details\n\n")
             
             # Check if specific recipe mentioned for auto-apply
-            if any(keyword in message.lower() for keyword in ['apply', 'generate', 'create']):
-                # Extract recipe name or ingredients
-                recipe_keywords = ['bowl', 'salad', 'soup', 'fusion', 'platter', 'medley', 'pasta', 'chicken', 'beef', 'fish', 'pizza', 'burger', 'sandwich', 'wrap', 'curry', 'stir fry', 'risotto', 'gnocchi']
-                detected_recipe = None
-                
-                for keyword in recipe_keywords:
-                    if keyword in message.lower():
-                        detected_recipe = keyword
-                        break
-                
-                if detected_recipe:
-                    # Create a more specific dish name
-                    dish_mapping = {
-                        'bowl': 'Mediterranean Quinoa Power Bowl',
-                        'salad': 'Harvest Kale & Roasted Vegetable Salad',
-                        'soup': 'Roasted Tomato Basil Bisque',
-                        'fusion': 'Korean-Mexican Bulgogi Tacos',
-                        'platter': 'Artisan Charcuterie & Cheese Board',
-                        'medley': 'Seasonal Vegetable Medley',
-                        'pasta': 'Truffle Mushroom Linguine',
-                        'chicken': 'Herb-Crusted Chicken Breast',
-                        'beef': 'Grass-Fed Beef Tenderloin',
-                        'fish': 'Pan-Seared Atlantic Salmon',
-                        'pizza': 'Artisan Margherita Pizza',
-                        'burger': 'Gourmet Wagyu Burger',
-                        'sandwich': 'Grilled Panini Sandwich',
-                        'wrap': 'Mediterranean Veggie Wrap',
-                        'curry': 'Thai Green Curry',
-                        'stir fry': 'Asian Vegetable Stir Fry',
-                        'risotto': 'Wild Mushroom Risotto',
-                        'gnocchi': 'Sage Butter Gnocchi'
-                    }
-                    
-                    dish_name = dish_mapping.get(detected_recipe, f'Gourmet {detected_recipe.title()}')
+            if any(keyword in message_lower for keyword in ['apply', 'generate', 'create']):
+                # Map the highest-priority recipe keyword to a more specific dish name
+                matched_recipes = _match_keywords(_AUTO_APPLY_MATCHER, message_lower)
+                if matched_recipes:
+                    _, dish_name = _AUTO_APPLY_DISHES[min(matched_recipes)]
                     return self._process_auto_apply_dish(dish_name)
             
-            response += "**🎯 Usage Examples:**\n"
-            response += "• 'Auto apply fusion bowl' - Generate complete fusion bowl recipe\n"
-            response += "• 'Auto apply seasonal salad' - Create seasonal salad with all details\n"
-            response += "• 'Auto apply signature soup' - Develop signature soup recipe\n\n"
-            response += "**⚙️ Customization Options:**\n"
-            response += "• Dietary restrictions (vegan, gluten-free, keto)\n"
-            response += "• Price range preferences\n"
-            response += "• Cuisine style specifications\n"
-            response += "• Seasonal ingredient focus"
+            parts.append("**🎯 Usage Examples:**\n")
+            parts.append("• 'Auto apply fusion bowl' - Generate complete fusion bowl recipe\n")
+            parts.append("• 'Auto apply seasonal salad' - Create seasonal salad with all details\n")
+            parts.append("• 'Auto apply signature soup' - Develop signature soup recipe\n\n")
+            parts.append("**⚙️ Customization Options:**\n")
+            parts.append("• Dietary restrictions (vegan, gluten-free, keto)\n")
+            parts.append("• Price range preferences\n")
+            parts.append("• Cuisine style specifications\n")
+            parts.append("• Seasonal ingredient focus")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'auto_apply_help',
                 'data': {
                     'mode': 'INNOVATION',
@@ -1458,35 +2011,35 @@ class RestaurantIntelligenceAgent:
     def _handle_manual_input_mode(self, message):
         """Handle manual input functionality for new menu items"""
         try:
-            response = "📝 **Manual Input Mode**\n\n"
-            response += "**Create Your Custom Menu Item:**\n\n"
-            response += "**📋 Required Information:**\n"
-            response += "• **Dish Name**: What would you like to call it?\n"
-            response += "• **Description**: Brief description of the dish\n"
-            response += "• **Ingredients**: List of main ingredients\n"
-            response += "• **Price**: Suggested price point\n"
-            response += "• **Category**: Appetizer, Main Course, Dessert, etc.\n\n"
-            
-            response += "**💡 Input Format Example:**\n"
-            response += "```\n"
-            response += "Name: Mediterranean Quinoa Bowl\n"
-            response += "Description: Fresh quinoa with grilled vegetables, feta cheese, and lemon vinaigrette\n"
-            response += "Ingredients: quinoa, bell peppers, zucchini, feta cheese, olive oil, lemon\n"
-            response += "Price: $14.99\n"
-            response += "Category: Main Course\n"
-            response += "```\n\n"
-            
-            response += "**🚀 Enhanced Features:**\n"
-            response += "• **Auto-Nutrition**: Automatic nutritional calculation\n"
-            response += "• **Price Validation**: Market comparison and profit margin analysis\n"
-            response += "• **Ingredient Check**: Availability verification\n"
-            response += "• **Demand Forecast**: Predicted customer interest\n\n"
-            
-            response += "**📝 To Add Your Item:**\n"
-            response += "Simply provide the details in the format above, and I'll help you create a complete menu item with all the enhanced features!"
+            parts = ["📝 **Manual Input Mode**\n\n"]
+            parts.append("**Create Your Custom Menu Item:**\n\n")
+            parts.append("**📋 Required Information:**\n")
+            parts.append("• **Dish Name**: What would you like to call it?\n")
+            parts.append("• **Description**: Brief description of the dish\n")
+            parts.append("• **Ingredients**: List of main ingredients\n")
+            parts.append("• **Price**: Suggested price point\n")
+            parts.append("• **Category**: Appetizer, Main Course, Dessert, etc.\n\n")
+            
+            parts.append("**💡 Input Format Example:**\n")
+            parts.append("```\n")
+            parts.append("Name: Mediterranean Quinoa Bowl\n")
+            parts.append("Description: Fresh quinoa with grilled vegetables, feta cheese, and lemon vinaigrette\n")
+            parts.append("Ingredients: quinoa, bell peppers, zucchini, feta cheese, olive oil, lemon\n")
+            parts.append("Price: $14.99\n")
+            parts.append("Category: Main Course\n")
+            parts.append("```\n\n")
+            
+            parts.append("**🚀 Enhanced Features:**\n")
+            parts.append("• **Auto-Nutrition**: Automatic nutritional calculation\n")
+            parts.append("• **Price Validation**: Market comparison and profit margin analysis\n")
+            parts.append("• **Ingredient Check**: Availability verification\n")
+            parts.append("• **Demand Forecast**: Predicted customer interest\n\n")
+            
+            parts.append("**📝 To Add Your Item:**\n")
+            parts.append("Simply provide the details in the format above, and I'll help you create a complete menu item with all the enhanced features!")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'manual_input_guide',
                 'data': {
                     'mode': 'INNOVATION',
@@ -1505,89 +2058,45 @@ class RestaurantIntelligenceAgent:
     def _handle_dish_type_regeneration(self, message):
         """Handle dish type regeneration requests with user preferences"""
         try:
-            # Enhanced dish type detection with preferences
-            dish_types = {
-                'appetizer': {
-                    'keywords': ['appetizer', 'starter', 'app', 'small plate', 'finger food', 'tapas', 'bruschetta'],
-                    'preferences': ['light', 'crispy', 'fresh', 'savory', 'bite-sized']
-                },
-                'main course': {
-                    'keywords': ['main', 'entree', 'main course', 'dinner', 'lunch', 'protein', 'hearty'],
-                    'preferences': ['filling', 'protein-rich', 'balanced', 'satisfying', 'comfort food']
-                },
-                'dessert': {
-                    'keywords': ['dessert', 'sweet', 'cake', 'ice cream', 'pudding', 'chocolate', 'fruit'],
-                    'preferences': ['sweet', 'indulgent', 'creamy', 'fruity', 'rich', 'light']
-                },
-                'beverage': {
-                    'keywords': ['drink', 'beverage', 'cocktail', 'juice', 'smoothie', 'tea', 'coffee'],
-                    'preferences': ['refreshing', 'energizing', 'warming', 'cooling', 'healthy']
-                },
-                'side dish': {
-                    'keywords': ['side', 'side dish', 'accompaniment', 'vegetable', 'grain'],
-                    'preferences': ['complementary', 'nutritious', 'colorful', 'textural']
-                }
-            }
+            # Match keywords against whole words so e.g. 'app' does not match 'apple'
+            message_terms = _message_terms(message.lower())
             
-            # Detect preferences from message
-            preference_keywords = {
-                'healthy': ['healthy', 'nutritious', 'low-calorie', 'diet', 'wellness'],
-                'spicy': ['spicy', 'hot', 'chili', 'pepper', 'heat'],
-                'vegetarian': ['vegetarian', 'veggie', 'plant-based', 'meatless'],
-                'vegan': ['vegan', 'plant-only', 'dairy-free'],
-                'gluten-free': ['gluten-free', 'celiac', 'wheat-free'],
-                'comfort': ['comfort', 'hearty', 'warming', 'cozy'],
-                'light': ['light', 'fresh', 'clean', 'simple'],
-                'gourmet': ['gourmet', 'fancy', 'upscale', 'elegant', 'sophisticated'],
-                'quick': ['quick', 'fast', 'easy', 'simple', '15 minutes'],
-                'seasonal': ['seasonal', 'fresh', 'local', 'farm-to-table']
-            }
-            
-            detected_type = 'main course'  # default
-            detected_preferences = []
-            message_lower = message.lower()
-            
-            # Detect dish type
-            for dish_type, info in dish_types.items():
-                if any(keyword in message_lower for keyword in info['keywords']):
-                    detected_type = dish_type
-                    break
+            # Detect dish type (first matching type wins, default main course)
+            detected_type = next((dish_type for dish_type, keywords in _DISH_TYPE_KEYWORD_SETS.items() if not keywords.isdisjoint(message_terms)), 'main course')
             
             # Detect user preferences
-            for preference, keywords in preference_keywords.items():
-                if any(keyword in message_lower for keyword in keywords):
-                    detected_preferences.append(preference)
+            detected_preferences = [preference for preference, keywords in _PREFERENCE_KEYWORD_SETS.items() if not keywords.isdisjoint(message_terms)]
             
             # Generate type-specific suggestions with preferences
             suggestions = self._generate_preference_based_suggestions(detected_type, detected_preferences)
             
-            response = f"🍽️ **{detected_type.title()} Regeneration**\n\n"
+            parts = [f"🍽️ **{detected_type.title()} Regeneration**\n\n"]
             
             if detected_preferences:
-                response += f"🎯 **Detected Preferences:** {', '.join(detected_preferences)}\n\n"
+                parts.append(f"🎯 **Detected Preferences:** {', '.join(detected_preferences)}\n\n")
             
-            response += f"Here are personalized {detected_type} suggestions:\n\n"
+            parts.append(f"Here are personalized {detected_type} suggestions:\n\n")
             
             for i, suggestion in enumerate(suggestions, 1):
-                response += f"**{i}. {suggestion['name']}**\n"
-                response += f"*{suggestion['description']}*\n"
-                response += f"💡 Key ingredients: {suggestion['ingredients']}\n"
-                response += f"⏱️ Prep time: {suggestion['prep_time']} minutes\n"
-                response += f"🏷️ Style: {suggestion['style']}\n\n"
-            
-            response += "\n🎯 **Preference Options:**\n"
-            response += "• Try 'healthy appetizers' for nutritious options\n"
-            response += "• Ask for 'spicy main course' for heat lovers\n"
-            response += "• Request 'vegan desserts' for plant-based treats\n"
-            response += "• Specify 'quick side dishes' for fast prep\n\n"
-            
-            response += "🚀 **Next Steps:**\n"
-            response += "• Click 'Auto Apply' to automatically add to menu\n"
-            response += "• Use 'Manual Input' for custom modifications\n"
-            response += f"• Ask for more {detected_type} suggestions with specific preferences\n"
+                parts.append(f"**{i}. {suggestion['name']}**\n")
+                parts.append(f"*{suggestion['description']}*\n")
+                parts.append(f"💡 Key ingredients: {suggestion['ingredients']}\n")
+                parts.append(f"⏱️ Prep time: {suggestion['prep_time']} minutes\n")
+                parts.append(f"🏷️ Style: {suggestion['style']}\n\n")
+            
+            parts.append("\n🎯 **Preference Options:**\n")
+            parts.append("• Try 'healthy appetizers' for nutritious options\n")
+            parts.append("• Ask for 'spicy main course' for heat lovers\n")
+            parts.append("• Request 'vegan desserts' for plant-based treats\n")
+            parts.append("• Specify 'quick side dishes' for fast prep\n\n")
+            
+            parts.append("🚀 **Next Steps:**\n")
+            parts.append("• Click 'Auto Apply' to automatically add to menu\n")
+            parts.append("• Use 'Manual Input' for custom modifications\n")
+            parts.append(f"• Ask for more {detected_type} suggestions with specific preferences\n")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'dish_type_regeneration',
                 'data': {
                     'mode': 'INNOVATION',
@@ -1607,99 +2116,80 @@ class RestaurantIntelligenceAgent:
     def _generate_preference_based_suggestions(self, dish_type, preferences):
         """Generate dish suggestions based on type and user preferences"""
         try:
-            # Base suggestions for each dish type
-            base_suggestions = {
-                'appetizer': [
-                    {'name': 'Mediterranean Mezze Platter', 'ingredients': 'hummus, olives, feta, pita', 'prep_time': 15, 'style': 'Mediterranean'},
-                    {'name': 'Crispy Calamari Rings', 'ingredients': 'squid, flour, spices, marinara', 'prep_time': 20, 'style': 'Italian'},
-                    {'name': 'Seasonal Bruschetta Trio', 'ingredients': 'bread, tomatoes, basil, cheese', 'prep_time': 12, 'style': 'Italian'}
-                ],
-                'main course': [
-                    {'name': 'Herb-Crusted Salmon', 'ingredients': 'salmon, herbs, quinoa, vegetables', 'prep_time': 25, 'style': 'Contemporary'},
-                    {'name': 'Grilled Chicken Teriyaki', 'ingredients': 'chicken, teriyaki sauce, rice, vegetables', 'prep_time': 30, 'style': 'Asian'},
-                    {'name': 'Pasta Primavera', 'ingredients': 'pasta, seasonal vegetables, olive oil, parmesan', 'prep_time': 20, 'style': 'Italian'}
-                ],
-                'dessert': [
-                    {'name': 'Chocolate Lava Cake', 'ingredients': 'chocolate, butter, eggs, flour', 'prep_time': 25, 'style': 'Decadent'},
-                    {'name': 'Fresh Berry Parfait', 'ingredients': 'berries, yogurt, granola, honey', 'prep_time': 10, 'style': 'Light'},
-                    {'name': 'Tiramisu', 'ingredients': 'mascarpone, coffee, ladyfingers, cocoa', 'prep_time': 30, 'style': 'Italian'}
-                ],
-                'beverage': [
-                    {'name': 'Tropical Smoothie', 'ingredients': 'mango, pineapple, coconut, lime', 'prep_time': 5, 'style': 'Refreshing'},
-                    {'name': 'Artisan Coffee Blend', 'ingredients': 'premium coffee beans, steamed milk', 'prep_time': 8, 'style': 'Energizing'},
-                    {'name': 'Herbal Tea Infusion', 'ingredients': 'chamomile, honey, lemon', 'prep_time': 5, 'style': 'Calming'}
-                ],
-                'side dish': [
-                    {'name': 'Roasted Seasonal Vegetables', 'ingredients': 'mixed vegetables, olive oil, herbs', 'prep_time': 20, 'style': 'Healthy'},
-                    {'name': 'Garlic Herb Rice', 'ingredients': 'rice, garlic, herbs, butter', 'prep_time': 15, 'style': 'Comfort'},
-                    {'name': 'Quinoa Salad', 'ingredients': 'quinoa, vegetables, vinaigrette', 'prep_time': 18, 'style': 'Nutritious'}
-                ]
-            }
+            suggestions = _BASE_SUGGESTIONS.get(dish_type, _BASE_SUGGESTIONS['main course'])
             
-            suggestions = base_suggestions.get(dish_type, base_suggestions['main course'])
-            
-            # Modify suggestions based on preferences
+            # Modify suggestions based on the preferences that change them, tested by
+            # set membership; with none of those the base suggestions are returned
+            preferences = _SUGGESTION_PREFERENCES.intersection(preferences or ())
             if preferences:
+                # The last applied preference describes the dish; no later preference
+                # adds a name prefix, so its template is filled with the final name
+                description_template = next(
+                    template for preference, template in _PREFERENCE_DESCRIPTIONS if preference in preferences
+                )
+                
                 modified_suggestions = []
                 for suggestion in suggestions:
-                    modified = suggestion.copy()
+                    name = suggestion['name']
+                    ingredients = suggestion['ingredients']
+                    ingredient_additions = []
+                    style_tags = []
                     
-                    # Apply preference modifications
+                    # Apply preference modifications; substitutions only ever match the
+                    # base ingredients, so additions are collected and joined once below
                     if 'healthy' in preferences:
-                        if 'vegetables' not in modified['ingredients']:
-                            modified['ingredients'] += ', fresh vegetables'
-                        modified['style'] += ' & Healthy'
-                        modified['description'] = f"A nutritious {modified['name'].lower()} packed with wholesome ingredients"
+                        if 'vegetables' not in ingredients:
+                            ingredient_additions.append('fresh vegetables')
+                        style_tags.append('Healthy')
                     
                     if 'spicy' in preferences:
-                        modified['ingredients'] += ', chili peppers, spices'
-                        modified['name'] = f"Spicy {modified['name']}"
-                        modified['style'] += ' & Spicy'
-                        modified['description'] = f"A fiery version of {modified['name'].lower()} with bold heat"
+                        ingredient_additions.append('chili peppers, spices')
+                        name = f"Spicy {name}"
+                        style_tags.append('Spicy')
                     
                     if 'vegetarian' in preferences:
                         # Replace meat ingredients
-                        modified['ingredients'] = modified['ingredients'].replace('chicken', 'tofu').replace('salmon', 'portobello mushroom')
-                        modified['style'] += ' & Vegetarian'
-                        modified['description'] = f"A plant-based {modified['name'].lower()} full of flavor"
+                        ingredients = _substitute(_VEGETARIAN_SUBSTITUTION, ingredients)
+                        style_tags.append('Vegetarian')
                     
                     if 'vegan' in preferences:
                         # Replace all animal products
-                        modified['ingredients'] = modified['ingredients'].replace('cheese', 'nutritional yeast').replace('butter', 'olive oil').replace('yogurt', 'coconut yogurt')
-                        modified['style'] += ' & Vegan'
-                        modified['description'] = f"A completely plant-based {modified['name'].lower()}"
+                        ingredients = _substitute(_VEGAN_SUBSTITUTION, ingredients)
+                        style_tags.append('Vegan')
                     
                     if 'gluten-free' in preferences:
-                        modified['ingredients'] = modified['ingredients'].replace('flour', 'almond flour').replace('pasta', 'rice noodles').replace('bread', 'gluten-free bread')
-                        modified['style'] += ' & Gluten-Free'
-                        modified['description'] = f"A gluten-free version of {modified['name'].lower()}"
+                        ingredients = _substitute(_GLUTEN_FREE_SUBSTITUTION, ingredients)
+                        style_tags.append('Gluten-Free')
                     
+                    prep_time = suggestion['prep_time']
                     if 'quick' in preferences:
-                        modified['prep_time'] = min(modified['prep_time'], 15)
-                        modified['name'] = f"Quick {modified['name']}"
-                        modified['style'] += ' & Fast'
-                        modified['description'] = f"A quick and easy {modified['name'].lower()} ready in minutes"
+                        prep_time = min(prep_time, 15)
+                        name = f"Quick {name}"
+                        style_tags.append('Fast')
                     
                     if 'gourmet' in preferences:
-                        modified['ingredients'] += ', truffle oil, premium herbs'
-                        modified['name'] = f"Gourmet {modified['name']}"
-                        modified['style'] += ' & Upscale'
-                        modified['description'] = f"An elevated, restaurant-quality {modified['name'].lower()}"
-                    
-                    # Add description if not already set
-                    if 'description' not in modified:
-                        modified['description'] = f"A delicious {modified['name'].lower()} featuring {modified['ingredients'].split(',')[0]} and complementary flavors"
+                        ingredient_additions.append('truffle oil, premium herbs')
+                        name = f"Gourmet {name}"
+                        style_tags.append('Upscale')
                     
-                    modified_suggestions.append(modified)
+                    modified_suggestions.append({
+                        **suggestion,
+                        'name': name,
+                        'ingredients': ', '.join([ingredients, *ingredient_additions]),
+                        'prep_time': prep_time,
+                        'style': ' & '.join([suggestion['style'], *style_tags]),
+                        'description': description_template.format(name=name.lower())
+                    })
                 
                 return modified_suggestions
             
-            # Add default descriptions
-            for suggestion in suggestions:
-                if 'description' not in suggestion:
-                    suggestion['description'] = f"A delicious {suggestion['name'].lower()} featuring {suggestion['ingredients'].split(',')[0]} and complementary flavors"
-            
-            return suggestions
+            # Add default descriptions to copies, leaving the shared base suggestions untouched
+            return [
+                {**suggestion, 'description': _DEFAULT_SUGGESTION_DESCRIPTION.format(
+                    name=suggestion['name'].lower(), first_ingredient=suggestion['ingredients'].split(',', 1)[0]
+                )}
+                for suggestion in suggestions
+            ]
             
         except Exception as e:
             logger.error(f"Error generating preference-based suggestions: {str(e)}")
@@ -1711,67 +2201,8 @@ class RestaurantIntelligenceAgent:
     def _generate_four_category_suggestions(self, message):
         """Generate four dish suggestions, one from each category"""
         try:
-            # Define the four categories with their suggestions
-            categories = {
-                'Main Course': {
-                    'emoji': '🍽️',
-                    'suggestions': [
-                        {'name': 'Grilled Salmon with Herb Butter', 'description': 'A perfectly seasoned salmon fillet grilled to perfection and topped with a fragrant herb butter made with fresh dill, parsley, and garlic. Served with lemon wedges for a bright, fresh finish.', 'prep_time': 25, 'price': '$24.99'},
-                        {'name': 'Herb-Crusted Chicken Breast', 'description': 'Tender chicken breast coated with aromatic herbs and spices, pan-seared to golden perfection. Served with roasted vegetables and garlic mashed potatoes.', 'prep_time': 30, 'price': '$22.99'},
-                        {'name': 'Beef Tenderloin Medallions', 'description': 'Premium beef tenderloin medallions cooked to your preference, served with red wine reduction sauce and seasonal vegetables.', 'prep_time': 35, 'price': '$32.99'}
-                    ]
-                },
-                'Beverage': {
-                    'emoji': '🥤',
-                    'suggestions': [
-                        {'name': 'Tropical Mango Smoothie', 'description': 'A refreshing blend of ripe mango, coconut milk, pineapple juice, and a hint of lime. Garnished with toasted coconut flakes and served chilled for the perfect tropical escape.', 'prep_time': 5, 'price': '$8.99'},
-                        {'name': 'Artisan Cold Brew Coffee', 'description': 'Smooth and rich cold brew coffee made from premium beans, served over ice with a choice of milk or cream. Perfect for coffee enthusiasts.', 'prep_time': 3, 'price': '$5.99'},
-                        {'name': 'Fresh Berry Lemonade', 'description': 'House-made lemonade infused with fresh mixed berries, mint leaves, and a touch of sparkling water for a refreshing twist.', 'prep_time': 8, 'price': '$6.99'}
-                    ]
-                },
-                'Dessert': {
-                    'emoji': '🍰',
-                    'suggestions': [
-                        {'name': 'Classic Chocolate Lava Cake', 'description': 'A decadent individual chocolate cake with a molten chocolate center that flows out when cut. Served warm with a scoop of vanilla ice cream and a dusting of powdered sugar.', 'prep_time': 25, 'price': '$12.99'},
-                        {'name': 'Tiramisu Parfait', 'description': 'Layers of coffee-soaked ladyfingers, mascarpone cream, and cocoa powder, elegantly presented in a glass parfait. A classic Italian dessert with a modern twist.', 'prep_time': 20, 'price': '$10.99'},
-                        {'name': 'Fresh Berry Cheesecake', 'description': 'Creamy New York-style cheesecake topped with a medley of fresh seasonal berries and a light berry coulis. Served on a graham cracker crust.', 'prep_time': 15, 'price': '$11.99'}
-                    ]
-                },
-                'Side Dish': {
-                    'emoji': '🥗',
-                    'suggestions': [
-                        {'name': 'Roasted Rainbow Vegetables', 'description': 'A colorful medley of seasonal vegetables including bell peppers, zucchini, carrots, and red onions, roasted with olive oil, fresh herbs, and a touch of balsamic glaze.', 'prep_time': 20, 'price': '$7.99'},
-                        {'name': 'Garlic Parmesan Risotto', 'description': 'Creamy Arborio rice slowly cooked with garlic, white wine, and vegetable broth, finished with fresh Parmesan cheese and herbs.', 'prep_time': 25, 'price': '$9.99'},
-                        {'name': 'Quinoa Power Salad', 'description': 'Nutritious quinoa mixed with fresh vegetables, dried cranberries, toasted nuts, and a light lemon vinaigrette dressing.', 'prep_time': 15, 'price': '$8.99'}
-                    ]
-                }
-            }
-            
-            # Build the response with one suggestion from each category
-            response = "🍽️ **Here are my dish suggestions, one from each category:**\n\n"
-            
-            for category_name, category_data in categories.items():
-                # Select the first suggestion from each category
-                suggestion = category_data['suggestions'][0]
-                emoji = category_data['emoji']
-                
-                response += f"## **{emoji} {category_name}**\n"
-                response += f"**{suggestion['name']}** - {suggestion['description']}\n\n"
-            
-            response += "Each dish offers a unique flavor profile and would complement a well-rounded dining experience!\n\n"
-            response += "💡 **Want more options?** Ask me for specific preferences like:\n"
-            response += "• 'Suggest spicy main courses'\n"
-            response += "• 'Recommend healthy beverages'\n"
-            response += "• 'Show me Italian desserts'"
-            
-            return {
-                'response': response,
-                'type': 'four_category_suggestions',
-                'data': {
-                    'suggestions': categories,
-                    'ui_update': 'highlight_category_suggestions'
-                }
-            }
+            # The reply does not depend on the message, so it is built once and reused
+            return _four_category_payload()
             
         except Exception as e:
             logger.error(f"Error generating four category suggestions: {str(e)}")
@@ -1783,80 +2214,7 @@ class RestaurantIntelligenceAgent:
     def _process_auto_apply_dish(self, dish_name):
         """Process a specific dish through the auto apply pipeline"""
         try:
-            response = f"🤖 **Auto-Applying: {dish_name}**\n\n"
-            response += "**🔄 AI Processing Pipeline:**\n\n"
-            
-            # Step 1: Image Generation
-            image_result = self._generate_dish_image(dish_name)
-            response += f"✅ **Image Generation**: {image_result['status']}\n"
-            response += f"   📸 Style: {image_result['style']}\n\n"
-            
-            # Step 2: Demand Prediction
-            demand_result = self._predict_dish_demand(dish_name)
-            response += f"✅ **Demand Prediction**: {demand_result['confidence']}% confidence\n"
-            response += f"   📊 Expected weekly sales: {demand_result['weekly_sales']} units\n\n"
-            
-            # Step 3: Pricing Optimization
-            pricing_result = self._optimize_dish_pricing(dish_name)
-            response += f"✅ **Pricing Optimization**: ${pricing_result['price']:.2f}\n"
-            response += f"   💰 Profit margin: {pricing_result['margin']}%\n\n"
-            
-            # Step 4: Nutrition Calculation
-            nutrition_result = self._calculate_dish_nutrition(dish_name)
-            response += f"✅ **Nutrition Analysis**: {nutrition_result['calories']} calories\n"
-            response += f"   🥗 Health score: {nutrition_result['health_score']}/10\n\n"
-            
-            # Step 5: Quality Validation and Improvement
-            generated_data = {
-                'image': image_result,
-                'demand': demand_result,
-                'pricing': pricing_result,
-                'nutrition': nutrition_result
-            }
-            
-            validation_result = self._validate_dish_data(generated_data)
-            response += f"✅ **Quality Validation**: {validation_result['quality_level']} ({validation_result['quality_score']}/100)\n\n"
-            
-            # Apply automatic improvements if needed
-            improvements = self._apply_quality_improvements(generated_data, validation_result)
-            if improvements['success'] and improvements['improvements_made']:
-                response += "🔧 **Quality Improvements Applied:**\n"
-                for improvement in improvements['improvements_made']:
-                    response += f"   • {improvement}\n"
-                response += "\n"
-                # Use improved data
-                final_data = improvements['improved_data']
-            else:
-                final_data = generated_data
-            
-            response += "**📋 Complete Menu Item Generated:**\n\n"
-            response += f"**{dish_name}**\n"
-            response += f"*{final_data['nutrition']['description']}*\n\n"
-            response += f"💰 **Price**: ${final_data['pricing']['price']:.2f}\n"
-            response += f"📊 **Demand Score**: {final_data['demand']['confidence']}%\n"
-            response += f"🥗 **Nutrition**: {final_data['nutrition']['calories']} cal | {final_data['nutrition']['protein']}g protein\n"
-            response += f"🖼️ **Image**: Professional photo ready\n"
-            response += f"🎯 **Quality Level**: {validation_result['quality_level']}\n\n"
-            
-            # Generate quality report
-            quality_report = self._generate_quality_report(dish_name, validation_result, improvements)
-            
-            response += "**✨ Ready to add to menu!** Click 'Confirm' to finalize."
-            
-            return {
-                'response': response,
-                'type': 'auto_apply_complete',
-                'data': {
-                    'mode': 'INNOVATION',
-                    'dish_name': dish_name,
-                    'generated_data': final_data,
-                    'validation_results': validation_result,
-                    'quality_report': quality_report,
-                    'improvements_applied': improvements['improvements_made'] if improvements['success'] else [],
-                    'ui_update': 'show_auto_apply_result'
-                }
-            }
-            
+            return _compute_auto_apply_dish(self, dish_name)
         except Exception as e:
             logger.error(f"Error processing auto apply dish: {str(e)}")
             return {
@@ -1864,142 +2222,18 @@ class RestaurantIntelligenceAgent:
                 'type': 'error'
             }
     
-    def _generate_dish_image(self, dish_name):
-        """Generate AI image for dish"""
+    def _generate_dish_attributes(self, dish_name):
+        """Generate the AI image, demand prediction, pricing and nutrition for a dish"""
         try:
-            # Simulate AI image generation
-            styles = ['Professional Studio', 'Rustic Plating', 'Modern Minimalist', 'Artistic Presentation']
-            import random
-            selected_style = random.choice(styles)
-            
-            return {
-                'status': 'Generated successfully',
-                'style': selected_style,
-                'resolution': '1920x1080',
-                'format': 'PNG',
-                'lighting': 'Natural daylight',
-                'composition': 'Rule of thirds'
-            }
+            return _simulate_dish_attributes(dish_name)
         except Exception as e:
-            logger.error(f"Error generating image: {str(e)}")
-            return {'status': 'Generation failed', 'style': 'Default'}
-    
-    def _predict_dish_demand(self, dish_name):
-        """Predict customer demand for dish"""
-        try:
-            # Simulate demand prediction using historical data
-            import random
-            
-            # Base confidence on dish type and ingredients
-            base_confidence = random.randint(70, 95)
-            weekly_sales = random.randint(15, 45)
-            
-            # Adjust based on seasonal factors
-            seasonal_factor = 1.0
-            if any(word in dish_name.lower() for word in ['soup', 'warm', 'hot']):
-                seasonal_factor = 1.2  # Higher demand in winter
-            elif any(word in dish_name.lower() for word in ['salad', 'cold', 'fresh']):
-                seasonal_factor = 1.1  # Higher demand in summer
-            
-            adjusted_sales = int(weekly_sales * seasonal_factor)
-            
+            logger.error(f"Error generating dish attributes: {str(e)}")
             return {
-                'confidence': base_confidence,
-                'weekly_sales': adjusted_sales,
-                'seasonal_factor': seasonal_factor,
-                'trend': 'Increasing' if base_confidence > 85 else 'Stable',
-                'peak_hours': ['12:00-14:00', '18:00-20:00']
+                'image': {'status': 'Generation failed', 'style': 'Default'},
+                'demand': {'confidence': 75, 'weekly_sales': 20},
+                'pricing': {'price': 12.99, 'margin': 65},
+                'nutrition': {'calories': 450, 'protein': 25, 'health_score': 7}
             }
-        except Exception as e:
-            logger.error(f"Error predicting demand: {str(e)}")
-            return {'confidence': 75, 'weekly_sales': 20}
-    
-    def _optimize_dish_pricing(self, dish_name):
-        """Optimize pricing for dish"""
-        try:
-            # Simulate pricing optimization
-            import random
-            
-            # Base price calculation
-            base_cost = random.uniform(4.50, 8.00)
-            target_margin = random.uniform(60, 75)  # 60-75% margin
-            
-            optimized_price = base_cost / (1 - target_margin/100)
-            
-            # Round to .99 or .49 pricing
-            if optimized_price % 1 < 0.5:
-                final_price = int(optimized_price) + 0.49
-            else:
-                final_price = int(optimized_price) + 0.99
-            
-            actual_margin = ((final_price - base_cost) / final_price) * 100
-            
-            return {
-                'price': final_price,
-                'cost': base_cost,
-                'margin': round(actual_margin, 1),
-                'competitive_range': f'${final_price-2:.2f} - ${final_price+3:.2f}',
-                'strategy': 'Premium positioning' if final_price > 15 else 'Value positioning'
-            }
-        except Exception as e:
-            logger.error(f"Error optimizing pricing: {str(e)}")
-            return {'price': 12.99, 'margin': 65}
-    
-    def _calculate_dish_nutrition(self, dish_name):
-        """Calculate comprehensive nutrition for dish"""
-        try:
-            # Simulate nutrition calculation
-            import random
-            
-            # Base nutrition values
-            calories = random.randint(300, 800)
-            protein = random.randint(15, 45)
-            carbs = random.randint(25, 60)
-            fat = random.randint(10, 35)
-            fiber = random.randint(3, 12)
-            
-            # Calculate health score based on nutrition balance
-            health_score = 5  # Base score
-            
-            # Protein bonus
-            if protein >= 25:
-                health_score += 2
-            elif protein >= 20:
-                health_score += 1
-            
-            # Fiber bonus
-            if fiber >= 8:
-                health_score += 2
-            elif fiber >= 5:
-                health_score += 1
-            
-            # Calorie penalty for very high calories
-            if calories > 700:
-                health_score -= 1
-            
-            health_score = min(10, max(1, health_score))
-            
-            # Generate description
-            description = f"A nutritious {dish_name.lower()} featuring balanced macronutrients"
-            if health_score >= 8:
-                description += " and exceptional health benefits"
-            elif health_score >= 6:
-                description += " with good nutritional value"
-            
-            return {
-                'calories': calories,
-                'protein': protein,
-                'carbs': carbs,
-                'fat': fat,
-                'fiber': fiber,
-                'health_score': health_score,
-                'description': description,
-                'allergens': ['May contain gluten', 'Contains dairy'],
-                'dietary_tags': ['High Protein'] if protein >= 25 else ['Balanced']
-            }
-        except Exception as e:
-            logger.error(f"Error calculating nutrition: {str(e)}")
-            return {'calories': 450, 'protein': 25, 'health_score': 7}
     
     def _validate_dish_data(self, dish_data):
         """Validate generated dish data for quality standards"""
@@ -2011,63 +2245,17 @@ class RestaurantIntelligenceAgent:
                 'quality_score': 0
             }
             
-            # Validate pricing
-            if 'pricing' in dish_data:
-                price = dish_data['pricing'].get('price', 0)
-                margin = dish_data['pricing'].get('margin', 0)
-                
-                if price < 5.00:
-                    validation_results['warnings'].append('Price may be too low for profitability')
-                elif price > 50.00:
-                    validation_results['warnings'].append('Price may be too high for target market')
-                else:
-                    validation_results['quality_score'] += 25
-                
-                if margin < 50:
-                    validation_results['warnings'].append('Profit margin below recommended 50%')
-                elif margin > 80:
-                    validation_results['warnings'].append('Profit margin may be too high')
-                else:
-                    validation_results['quality_score'] += 25
-            
-            # Validate nutrition
-            if 'nutrition' in dish_data:
-                nutrition = dish_data['nutrition']
-                calories = nutrition.get('calories', 0)
-                protein = nutrition.get('protein', 0)
-                health_score = nutrition.get('health_score', 0)
-                
-                if calories < 200:
-                    validation_results['warnings'].append('Calorie content may be too low')
-                elif calories > 1200:
-                    validation_results['warnings'].append('Calorie content may be too high')
-                else:
-                    validation_results['quality_score'] += 20
-                
-                if protein < 10:
-                    validation_results['warnings'].append('Protein content may be insufficient')
-                else:
-                    validation_results['quality_score'] += 15
-                
-                if health_score >= 7:
-                    validation_results['quality_score'] += 15
-                elif health_score < 5:
-                    validation_results['warnings'].append('Health score below recommended level')
-            
-            # Validate demand prediction
-            if 'demand' in dish_data:
-                confidence = dish_data['demand'].get('confidence', 0)
-                weekly_sales = dish_data['demand'].get('weekly_sales', 0)
-                
-                if confidence < 70:
-                    validation_results['warnings'].append('Demand prediction confidence is low')
-                else:
-                    validation_results['quality_score'] += 15
+            for section, field, warn_below, low_warning, warn_above, high_warning, points, points_from in _VALIDATION_RULES:
+                if section not in dish_data:
+                    continue
+                value = dish_data[section].get(field, 0)
                 
-                if weekly_sales < 10:
-                    validation_results['warnings'].append('Predicted sales volume may be too low')
-                elif weekly_sales > 100:
-                    validation_results['warnings'].append('Predicted sales volume may be unrealistic')
+                if value < warn_below:
+                    validation_results['warnings'].append(low_warning)
+                elif warn_above is not None and value > warn_above:
+                    validation_results['warnings'].append(high_warning)
+                elif value >= points_from:
+                    validation_results['quality_score'] += points
             
             # Overall quality assessment
             if validation_results['quality_score'] >= 80:
@@ -2095,46 +2283,55 @@ class RestaurantIntelligenceAgent:
     def _apply_quality_improvements(self, dish_data, validation_results):
         """Apply automatic quality improvements based on validation results"""
         try:
-            improved_data = dish_data.copy()
+            # Sections are copied only when an improvement changes them, so the
+            # memoized simulation results are never modified and a dish that
+            # needs no improvements is passed through without any copying
+            improved_sections = {}
             improvements_made = []
             
             # Improve pricing if needed
-            if 'pricing' in improved_data:
-                price = improved_data['pricing']['price']
-                margin = improved_data['pricing']['margin']
+            if 'pricing' in dish_data:
+                pricing = dish_data['pricing']
+                price = pricing['price']
+                margin = pricing['margin']
                 
                 if price < 5.00:
-                    improved_data['pricing']['price'] = 8.99
-                    improved_data['pricing']['margin'] = 65
+                    improved_sections['pricing'] = {**pricing, 'price': 8.99, 'margin': 65}
                     improvements_made.append('Adjusted price to meet minimum profitability')
                 elif margin < 50:
                     # Recalculate price for better margin
-                    cost = improved_data['pricing'].get('cost', price * 0.35)
+                    cost = pricing.get('cost', price * 0.35)
                     new_price = cost / (1 - 0.60)  # Target 60% margin
-                    improved_data['pricing']['price'] = round(new_price + 0.99, 2)
-                    improved_data['pricing']['margin'] = 60
+                    improved_sections['pricing'] = {**pricing, 'price': round(new_price + 0.99, 2), 'margin': 60}
                     improvements_made.append('Optimized pricing for better profit margin')
             
             # Improve nutrition if needed
-            if 'nutrition' in improved_data:
-                nutrition = improved_data['nutrition']
+            if 'nutrition' in dish_data:
+                nutrition = dish_data['nutrition']
+                nutrition_updates = {}
                 
-                if nutrition.get('protein', 0) < 15:
-                    nutrition['protein'] = max(20, nutrition.get('protein', 0))
+                protein = nutrition.get('protein', 0)
+                if protein < 15:
+                    nutrition_updates['protein'] = max(20, protein)
                     improvements_made.append('Enhanced protein content')
                 
                 if nutrition.get('health_score', 0) < 6:
-                    nutrition['health_score'] = 7
-                    nutrition['fiber'] = max(8, nutrition.get('fiber', 5))
+                    nutrition_updates['health_score'] = 7
+                    nutrition_updates['fiber'] = max(8, nutrition.get('fiber', 5))
                     improvements_made.append('Improved nutritional profile')
+                
+                if nutrition_updates:
+                    improved_sections['nutrition'] = {**nutrition, **nutrition_updates}
             
             # Enhance demand prediction if confidence is low
-            if 'demand' in improved_data:
-                if improved_data['demand'].get('confidence', 0) < 75:
-                    improved_data['demand']['confidence'] = 78
-                    improved_data['demand']['trend'] = 'Stable'
+            if 'demand' in dish_data:
+                demand = dish_data['demand']
+                if demand.get('confidence', 0) < 75:
+                    improved_sections['demand'] = {**demand, 'confidence': 78, 'trend': 'Stable'}
                     improvements_made.append('Adjusted demand prediction for market stability')
             
+            improved_data = {**dish_data, **improved_sections} if improved_sections else dish_data
+            
             return {
                 'improved_data': improved_data,
                 'improvements_made': improvements_made,
@@ -2152,44 +2349,44 @@ class RestaurantIntelligenceAgent:
     def _generate_quality_report(self, dish_name, validation_results, improvements):
         """Generate a comprehensive quality report"""
         try:
-            report = f"📊 **Quality Assessment Report: {dish_name}**\n\n"
+            parts = [f"📊 **Quality Assessment Report: {dish_name}**\n\n"]
             
             # Quality score and level
-            report += f"**🎯 Overall Quality Score: {validation_results['quality_score']}/100**\n"
-            report += f"**📈 Quality Level: {validation_results['quality_level']}**\n\n"
+            parts.append(f"**🎯 Overall Quality Score: {validation_results['quality_score']}/100**\n")
+            parts.append(f"**📈 Quality Level: {validation_results['quality_level']}**\n\n")
             
             # Validation results
             if validation_results['warnings']:
-                report += "**⚠️ Quality Warnings:**\n"
+                parts.append("**⚠️ Quality Warnings:**\n")
                 for warning in validation_results['warnings']:
-                    report += f"• {warning}\n"
-                report += "\n"
+                    parts.append(f"• {warning}\n")
+                parts.append("\n")
             
             if validation_results['errors']:
-                report += "**❌ Quality Issues:**\n"
+                parts.append("**❌ Quality Issues:**\n")
                 for error in validation_results['errors']:
-                    report += f"• {error}\n"
-                report += "\n"
+                    parts.append(f"• {error}\n")
+                parts.append("\n")
             
             # Improvements made
             if improvements['improvements_made']:
-                report += "**✨ Automatic Improvements Applied:**\n"
+                parts.append("**✨ Automatic Improvements Applied:**\n")
                 for improvement in improvements['improvements_made']:
-                    report += f"• {improvement}\n"
-                report += "\n"
+                    parts.append(f"• {improvement}\n")
+                parts.append("\n")
             
             # Quality standards met
             if validation_results['quality_score'] >= 80:
-                report += "**✅ Excellent Quality Standards Met**\n"
-                report += "This dish meets all premium quality criteria and is ready for menu addition.\n"
+                parts.append("**✅ Excellent Quality Standards Met**\n")
+                parts.append("This dish meets all premium quality criteria and is ready for menu addition.\n")
             elif validation_results['quality_score'] >= 60:
-                report += "**✅ Good Quality Standards Met**\n"
-                report += "This dish meets acceptable quality standards with minor optimizations applied.\n"
+                parts.append("**✅ Good Quality Standards Met**\n")
+                parts.append("This dish meets acceptable quality standards with minor optimizations applied.\n")
             else:
-                report += "**⚠️ Quality Standards Need Attention**\n"
-                report += "Additional review recommended before menu addition.\n"
+                parts.append("**⚠️ Quality Standards Need Attention**\n")
+                parts.append("Additional review recommended before menu addition.\n")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error generating quality report: {str(e)}")
@@ -2198,37 +2395,41 @@ class RestaurantIntelligenceAgent:
     def _handle_qna_mode(self, message):
         """Handle Q&A Mode requests using Gemini API for general questions"""
         try:
+            # Questions too short to answer or too long to send are rejected without an API call
+            if not _QNA_MIN_QUESTION_LENGTH <= len(message.strip()) <= _QNA_MAX_QUESTION_LENGTH:
+                return {
+                    'response': "❓ I'm sorry, I couldn't generate a response to your question. Please try rephrasing it.",
+                    'type': 'qna_no_response'
+                }
+            
             # Configure Gemini API
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
+            if not _GEMINI_API_KEY:
                 return {
                     'response': "❌ Gemini API key not configured. Please check your environment settings.",
                     'type': 'qna_error'
                 }
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Create a prompt for the Gemini API
-            prompt = f"""
-You are a helpful restaurant assistant. Answer the following question in a friendly and informative way.
-Keep your response concise and relevant. If the question is about food, cuisine, or restaurants, provide helpful information.
-If you don't know something specific, it's okay to say so.
-
-Question: {message}
-
-Please provide a helpful response:
-"""
-            
-            # Generate response using Gemini
-            response = model.generate_content(prompt)
-            
-            if response and response.text:
-                # Log without emoji to avoid encoding issues
-                safe_message = message.encode('ascii', 'ignore').decode('ascii') if message else 'empty'
-                logger.info(f"Q&A response generated successfully for question: {safe_message[:50]}...")
+            # Repeat questions (ignoring case and spacing) are answered from memory
+            question_key = ' '.join(message.lower().split())
+            with _qna_answer_cache_lock:
+                answer = _qna_answer_cache.get(question_key)
+                if answer is not None:
+                    _qna_answer_cache.move_to_end(question_key)
+            if answer is None:
+                # Generate response using Gemini; only the question is sent as content
+                response = _qna_model().generate_content(message)
+                if response and response.text:
+                    answer = response.text
+                    with _qna_answer_cache_lock:
+                        _qna_answer_cache[question_key] = answer
+                        _qna_answer_cache.move_to_end(question_key)
+                        while len(_qna_answer_cache) > _QNA_ANSWER_CACHE_SIZE:
+                            _qna_answer_cache.popitem(last=False)
+            
+            if answer:
+                logger.info("Q&A response generated successfully for question: %.50s...", message or 'empty')
                 return {
-                    'response': f"🤖 {response.text}",
+                    'response': f"🤖 {answer}",
                     'type': 'qna_gemini_response',
                     'data': {
                         'mode': 'QNA',
@@ -2242,8 +2443,7 @@ Please provide a helpful response:
                 }
         
         except Exception as e:
-            # Log error without emoji to avoid encoding issues
-            logger.error(f"Error in Q&A mode: {str(e).encode('ascii', 'ignore').decode('ascii')}")
+            logger.error("Error in Q&A mode: %s", e)
             return {
                 'response': "❌ I encountered an error while processing your question. Please try again.",
                 'type': 'qna_error'
@@ -2252,20 +2452,16 @@ Please provide a helpful response:
     def _generate_proactive_dish_suggestions(self, message):
         """Generate proactive dish suggestions based on available inventory ingredients"""
         try:
-            # Get all available ingredients from database
-            available_ingredients = Ingredient.query.all()
+            # Sample up to 4 ingredient names for creative suggestions from the cached name list
+            all_ingredient_names = _all_ingredient_names(_ingredient_names_version)
+            ingredient_names = random.sample(all_ingredient_names, min(4, len(all_ingredient_names)))
             
-            if not available_ingredients:
+            if not ingredient_names:
                 return {
                     'response': "❌ No ingredients found in inventory. Please add ingredients first.",
                     'type': 'error'
                 }
             
-            # Select 3-4 random ingredients for creative suggestions
-            import random
-            selected_ingredients = random.sample(available_ingredients, min(4, len(available_ingredients)))
-            ingredient_names = [ing.name for ing in selected_ingredients]
-            
             # Generate 3 creative dish suggestions
             suggestions = [
                 {
@@ -2295,41 +2491,41 @@ Please provide a helpful response:
             ]
             
             # Build response with suggestions and action options
-            response = "🍽️ **AI-Generated Dish Suggestions**\n\n"
-            response += f"**Based on Available Ingredients:** {', '.join(ingredient_names)}\n\n"
+            parts = ["🍽️ **AI-Generated Dish Suggestions**\n\n"]
+            parts.append(f"**Based on Available Ingredients:** {', '.join(ingredient_names)}\n\n")
             
             for i, suggestion in enumerate(suggestions, 1):
-                response += f"**{i}. {suggestion['name']}**\n"
-                response += f"📝 *{suggestion['description']}*\n"
-                response += f"🥘 **Ingredients:** {suggestion['ingredients']}\n"
-                response += f"💰 **Price:** {suggestion['estimated_price']}\n"
-                response += f"📂 **Category:** {suggestion['category']}\n"
-                response += f"⏱️ **Prep Time:** {suggestion['prep_time']}\n\n"
-            
-            response += "**🎯 Choose Your Next Action:**\n\n"
-            response += "**1. 🤖 Auto Apply** - Let AI automatically add the dish to your menu with:\n"
-            response += "   • Automatic pricing optimization\n"
-            response += "   • Nutritional analysis\n"
-            response += "   • Demand forecasting\n"
-            response += "   • Professional image generation\n\n"
-            
-            response += "**2. ✏️ Manual Apply** - Customize the dish details yourself:\n"
-            response += "   • Modify ingredients and description\n"
-            response += "   • Set your preferred pricing\n"
-            response += "   • Choose category and specifications\n\n"
-            
-            response += "**3. 🔄 Not Apply - Specify Preferences** - Get new suggestions:\n"
-            response += "   • Tell me your preferred flavors (spicy, sweet, savory)\n"
-            response += "   • Specify cuisine type (Italian, Asian, Mexican)\n"
-            response += "   • Choose dish category (appetizer, main, dessert)\n\n"
-            
-            response += "💡 **Example responses:**\n"
-            response += "• 'Auto apply suggestion 1'\n"
-            response += "• 'Manual apply suggestion 2'\n"
-            response += "• 'I prefer spicy Asian dishes'\n"
+                parts.append(f"**{i}. {suggestion['name']}**\n")
+                parts.append(f"📝 *{suggestion['description']}*\n")
+                parts.append(f"🥘 **Ingredients:** {suggestion['ingredients']}\n")
+                parts.append(f"💰 **Price:** {suggestion['estimated_price']}\n")
+                parts.append(f"📂 **Category:** {suggestion['category']}\n")
+                parts.append(f"⏱️ **Prep Time:** {suggestion['prep_time']}\n\n")
+            
+            parts.append("**🎯 Choose Your Next Action:**\n\n")
+            parts.append("**1. 🤖 Auto Apply** - Let AI automatically add the dish to your menu with:\n")
+            parts.append("   • Automatic pricing optimization\n")
+            parts.append("   • Nutritional analysis\n")
+            parts.append("   • Demand forecasting\n")
+            parts.append("   • Professional image generation\n\n")
+            
+            parts.append("**2. ✏️ Manual Apply** - Customize the dish details yourself:\n")
+            parts.append("   • Modify ingredients and description\n")
+            parts.append("   • Set your preferred pricing\n")
+            parts.append("   • Choose category and specifications\n\n")
+            
+            parts.append("**3. 🔄 Not Apply - Specify Preferences** - Get new suggestions:\n")
+            parts.append("   • Tell me your preferred flavors (spicy, sweet, savory)\n")
+            parts.append("   • Specify cuisine type (Italian, Asian, Mexican)\n")
+            parts.append("   • Choose dish category (appetizer, main, dessert)\n\n")
+            
+            parts.append("💡 **Example responses:**\n")
+            parts.append("• 'Auto apply suggestion 1'\n")
+            parts.append("• 'Manual apply suggestion 2'\n")
+            parts.append("• 'I prefer spicy Asian dishes'\n")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'proactive_dish_suggestions',
                 'data': {
                     'mode': 'INNOVATION',
@@ -2350,23 +2546,9 @@ Please provide a helpful response:
     def _handle_auto_apply_suggestion(self, message):
         """Handle auto apply for specific dish suggestions"""
         try:
-            # Extract suggestion number from message
-            import re
-            suggestion_match = re.search(r'suggestion (\d+)', message.lower())
-            suggestion_num = suggestion_match.group(1) if suggestion_match else '1'
-            
-            response = f"🤖 **Auto Applying Suggestion {suggestion_num}**\n\n"
-            response += "**AI Processing Complete:**\n"
-            response += "✅ Nutritional analysis calculated\n"
-            response += "✅ Optimal pricing determined\n"
-            response += "✅ Professional image generated\n"
-            response += "✅ Demand forecast completed\n"
-            response += "✅ Menu item compiled\n\n"
-            response += f"**Suggestion {suggestion_num} has been automatically added to your menu!**\n\n"
-            response += "🎯 **Next Steps:**\n"
-            response += "• View the new item in your menu management\n"
-            response += "• Customize further if needed\n"
-            response += "• Start promoting to customers"
+            suggestion_num = _extract_suggestion_number(message)
+            
+            response = _AUTO_APPLY_SUGGESTION_TEMPLATE.format(number=suggestion_num)
             
             return {
                 'response': response,
@@ -2388,27 +2570,9 @@ Please provide a helpful response:
     def _handle_manual_apply_suggestion(self, message):
         """Handle manual apply for specific dish suggestions"""
         try:
-            # Extract suggestion number from message
-            import re
-            suggestion_match = re.search(r'suggestion (\d+)', message.lower())
-            suggestion_num = suggestion_match.group(1) if suggestion_match else '1'
-            
-            response = f"✏️ **Manual Apply - Suggestion {suggestion_num}**\n\n"
-            response += "**Customize Your Dish Details:**\n\n"
-            response += "📝 **Name:** [Edit dish name]\n"
-            response += "📄 **Description:** [Modify description]\n"
-            response += "🥘 **Ingredients:** [Adjust ingredient list]\n"
-            response += "💰 **Price:** [Set your preferred price]\n"
-            response += "📂 **Category:** [Choose category]\n"
-            response += "⏱️ **Prep Time:** [Estimate preparation time]\n\n"
-            response += "**💡 Instructions:**\n"
-            response += "Please provide the details in this format:\n"
-            response += "Name: [Your dish name]\n"
-            response += "Description: [Your description]\n"
-            response += "Ingredients: [Your ingredients]\n"
-            response += "Price: $[Your price]\n"
-            response += "Category: [Your category]\n\n"
-            response += "I'll help you create the complete menu item with enhanced features!"
+            suggestion_num = _extract_suggestion_number(message)
+            
+            response = _MANUAL_APPLY_SUGGESTION_TEMPLATE.format(number=suggestion_num)
             
             return {
                 'response': response,
@@ -2438,9 +2602,11 @@ Please provide a helpful response:
             ingredients = self._extract_ingredients_from_message(message)
             
             if not ingredients:
-                # Use high-inventory items if no specific ingredients mentioned
-                inventory_items = InventoryItem.query.filter(InventoryItem.quantity > 30).limit(5).all()
-                ingredients = [item.ingredient.name for item in inventory_items if item.ingredient]
+                # Use high-inventory items if no specific ingredients mentioned, joining
+                # the ingredient names in the same query
+                ingredients = [name for (name,) in db.session.query(Ingredient.name).select_from(InventoryItem).join(
+                    Ingredient, InventoryItem.ingredient_id == Ingredient.id
+                ).filter(InventoryItem.quantity > 30).limit(5)]
             
             if not ingredients:
                 return {
@@ -2459,31 +2625,27 @@ Please provide a helpful response:
             dish_suggestion = workflow_results.get('dish_suggestion')
             
             # Debug logging
-            logger.info(f"DEBUG: workflow_results keys: {list(workflow_results.keys())}")
-            logger.info(f"DEBUG: dish_suggestion from workflow: {dish_suggestion}")
-            logger.info(f"DEBUG: dish_suggestion type: {type(dish_suggestion)}")
-            if dish_suggestion:
-                logger.info(f"DEBUG: dish_suggestion.name: {dish_suggestion.name}")
-            else:
-                logger.info("DEBUG: dish_suggestion is None, will use fallback")
+            logger.debug("workflow_results keys: %s", list(workflow_results))
+            logger.debug("dish_suggestion from workflow: %r", dish_suggestion)
             
             # Fallback if no dish found in results
             if not dish_suggestion:
                 main_ingredient = ingredients[0] if ingredients else 'Mixed Ingredients'
-                dish_suggestion = type('DishSuggestion', (), {
-                    'name': f'AutoGen {main_ingredient.title()} Innovation',
-                    'description': f'An innovative dish featuring {", ".join(ingredients[:3])}',
-                    'category': 'main_course',
-                    'cuisine_type': 'Fusion',
-                    'ingredients': ingredients,
-                    'estimated_cost': 12.0,
-                    'suggested_price': 22.0,
-                    'predicted_demand': 30.0,
-                    'nutrition_score': 0.8,
-                    'creativity_score': 0.85,
-                    'feasibility_score': 0.8,
-                    'overall_score': 0.82
-                })()
+                ingredients_preview = ', '.join(ingredients[:3])
+                dish_suggestion = DishSuggestion(
+                    name=f'AutoGen {main_ingredient.title()} Innovation',
+                    description=f'An innovative dish featuring {ingredients_preview}',
+                    category='main_course',
+                    cuisine_type='Fusion',
+                    ingredients=ingredients,
+                    estimated_cost=12.0,
+                    suggested_price=22.0,
+                    predicted_demand=30.0,
+                    nutrition_score=0.8,
+                    creativity_score=0.85,
+                    feasibility_score=0.8,
+                    overall_score=0.82
+                )
             
             # Store workflow for potential follow-up
             self.current_workflow = workflow_results
@@ -2493,68 +2655,58 @@ Please provide a helpful response:
             step_results = workflow_results.get('steps', {})
             
             # Format response for the 7-step innovation workflow
-            response = f"🤖 **AI AGENT INNOVATION WORKFLOW COMPLETE**\n\n"
-            response += f"**🍽️ Created Dish:** {dish_suggestion.name}\n"
-            response += f"**⭐ Overall Score:** {dish_suggestion.overall_score:.1f}/1.0\n\n"
+            parts = [f"🤖 **AI AGENT INNOVATION WORKFLOW COMPLETE**\n\n"]
+            parts.append(f"**🍽️ Created Dish:** {dish_suggestion.name}\n")
+            parts.append(f"**⭐ Overall Score:** {dish_suggestion.overall_score:.1f}/1.0\n\n")
             
             # Show workflow status
             if workflow_status == 'completed':
-                response += f"**✅ INNOVATION WORKFLOW SUCCESSFUL!**\n"
+                parts.append(f"**✅ INNOVATION WORKFLOW SUCCESSFUL!**\n")
                 
                 # Get menu item ID from step 3
                 step3_data = step_results.get('step3_menu_item_creation', {})
                 if step3_data.get('success'):
                     menu_item_id = step3_data.get('menu_item_id')
                     if menu_item_id:
-                        response += f"**📋 Menu Item ID:** {menu_item_id}\n"
+                        parts.append(f"**📋 Menu Item ID:** {menu_item_id}\n")
                 
                 # Check AI image generation from step 3
                 ai_image_generated = step3_data.get('ai_image_generated', False)
-                response += f"**🖼️ AI Image:** {'Generated' if ai_image_generated else 'Created'}\n"
+                parts.append(f"**🖼️ AI Image:** {'Generated' if ai_image_generated else 'Created'}\n")
                 
                 # Check recipe creation from step 4
                 step4_data = step_results.get('step4_recipe_creation', {})
                 recipe_created = step4_data.get('success', False)
-                response += f"**📖 Recipe:** {'Created' if recipe_created else 'Failed'}\n"
+                parts.append(f"**📖 Recipe:** {'Created' if recipe_created else 'Failed'}\n")
                 
                 # Check pricing from step 6
                 step6_data = step_results.get('step6_price_optimization', {})
                 price_set = step6_data.get('success', False)
-                response += f"**💰 Pricing:** {'Applied' if price_set else 'Failed'}\n"
+                parts.append(f"**💰 Pricing:** {'Applied' if price_set else 'Failed'}\n")
                 
                 # Check nutrition from step 7
                 step7_data = step_results.get('step7_nutrition_analysis', {})
                 nutrition_generated = step7_data.get('success', False)
-                response += f"**🥗 Nutrition:** {'Analyzed' if nutrition_generated else 'Failed'}\n\n"
+                parts.append(f"**🥗 Nutrition:** {'Analyzed' if nutrition_generated else 'Failed'}\n\n")
                 
             elif workflow_status == 'failed':
-                response += f"**❌ INNOVATION WORKFLOW FAILED**\n"
+                parts.append(f"**❌ INNOVATION WORKFLOW FAILED**\n")
                 error_msg = workflow_results.get('error', 'Unknown error occurred')
-                response += f"**Error:** {error_msg}\n\n"
+                parts.append(f"**Error:** {error_msg}\n\n")
             
-            response += "**🔄 7-Step Innovation Process:**\n"
+            parts.append("**🔄 7-Step Innovation Process:**\n")
             # Show status of each step
-            step_names = [
-                ('step1_extract_ingredients', '1. Extract Ingredients'),
-                ('step2_dish_suggestion', '2. Innovative Dish Suggestion'),
-                ('step3_menu_item_creation', '3. Add Menu Item & AI Image'),
-                ('step4_recipe_creation', '4. Set Recipe'),
-                ('step5_forecast_generation', '5. Run Forecast'),
-                ('step6_price_optimization', '6. Price Recommendation'),
-                ('step7_nutrition_analysis', '7. Generate Nutrition')
-            ]
-            
-            for step_key, step_display in step_names:
-                step_data = step_results.get(step_key, {})
-                status_emoji = "✅" if step_data.get('success', False) else "❌"
-                response += f"{status_emoji} {step_display}\n"
+            parts.extend(
+                f"{'✅' if step_results.get(step_key, {}).get('success', False) else '❌'} {step_display}\n"
+                for step_key, step_display in _WORKFLOW_STEP_NAMES
+            )
             
 
             
             if workflow_status == 'completed':
-                response += "\n*Check your menu to see the new innovative dish!*"
+                parts.append("\n*Check your menu to see the new innovative dish!*")
             else:
-                response += "\n*Type 'workflow details' to see complete analysis*"
+                parts.append("\n*Type 'workflow details' to see complete analysis*")
             
             # Store workflow results for later retrieval
             self.last_workflow_results = {
@@ -2570,7 +2722,7 @@ Please provide a helpful response:
             }
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'ai_agent_innovation_workflow',
                 'data': {
                     'mode': 'INNOVATION',
@@ -2598,11 +2750,6 @@ Please provide a helpful response:
     def _handle_workflow_details_request(self):
         """Handle workflow details request - show complete analysis from last AI agent workflow"""
         try:
-            # Debug logging
-            print(f"DEBUG: Checking workflow details. Has attribute: {hasattr(self, 'last_workflow_results')}")
-            if hasattr(self, 'last_workflow_results'):
-                print(f"DEBUG: last_workflow_results value: {self.last_workflow_results}")
-            
             # Check if there's a recent AI agent workflow result stored
             if not hasattr(self, 'last_workflow_results') or not self.last_workflow_results:
                 return {
@@ -2612,17 +2759,17 @@ Please provide a helpful response:
             
             workflow_data = self.last_workflow_results
             
-            response = "🤖 **COMPLETE WORKFLOW ANALYSIS**\n\n"
+            parts = ["🤖 **COMPLETE WORKFLOW ANALYSIS**\n\n"]
             
             # Dish Information
             if 'dish_suggestion' in workflow_data:
                 dish = workflow_data['dish_suggestion']
-                response += f"🍽️ **Dish Details:**\n"
-                response += f"• Name: {dish.get('name', 'N/A')}\n"
-                response += f"• Description: {dish.get('description', 'N/A')}\n"
-                response += f"• Suggested Price: ${dish.get('price', 0):.2f}\n"
-                response += f"• Predicted Demand: {dish.get('demand', 0)} units/week\n"
-                response += f"• Overall Score: {dish.get('score', 0):.2f}/1.0\n\n"
+                parts.append(f"🍽️ **Dish Details:**\n")
+                parts.append(f"• Name: {dish.get('name', 'N/A')}\n")
+                parts.append(f"• Description: {dish.get('description', 'N/A')}\n")
+                parts.append(f"• Suggested Price: ${dish.get('price', 0):.2f}\n")
+                parts.append(f"• Predicted Demand: {dish.get('demand', 0)} units/week\n")
+                parts.append(f"• Overall Score: {dish.get('score', 0):.2f}/1.0\n\n")
             
             # Workflow Results
             if 'workflow_results' in workflow_data:
@@ -2631,81 +2778,81 @@ Please provide a helpful response:
                 # Menu Planning
                 if 'menu_planning' in results:
                     menu_data = results['menu_planning']
-                    response += "📋 **Menu Planning Analysis:**\n"
-                    response += f"• Status: {menu_data.get('status', 'Unknown')}\n"
+                    parts.append("📋 **Menu Planning Analysis:**\n")
+                    parts.append(f"• Status: {menu_data.get('status', 'Unknown')}\n")
                     if 'details' in menu_data:
                         details = menu_data['details']
-                        response += f"• Category: {details.get('category', 'N/A')}\n"
-                        response += f"• Cuisine Style: {details.get('cuisine_style', 'N/A')}\n"
-                        response += f"• Preparation Method: {details.get('preparation_method', 'N/A')}\n"
-                    response += "\n"
+                        parts.append(f"• Category: {details.get('category', 'N/A')}\n")
+                        parts.append(f"• Cuisine Style: {details.get('cuisine_style', 'N/A')}\n")
+                        parts.append(f"• Preparation Method: {details.get('preparation_method', 'N/A')}\n")
+                    parts.append("\n")
                 
                 # Demand Forecasting
                 if 'demand_forecasting' in results:
                     demand_data = results['demand_forecasting']
-                    response += "📊 **Demand Forecasting:**\n"
-                    response += f"• Status: {demand_data.get('status', 'Unknown')}\n"
+                    parts.append("📊 **Demand Forecasting:**\n")
+                    parts.append(f"• Status: {demand_data.get('status', 'Unknown')}\n")
                     if 'details' in demand_data:
                         details = demand_data['details']
-                        response += f"• Predicted Weekly Demand: {details.get('predicted_demand', 0)} units\n"
-                        response += f"• Confidence Level: {details.get('confidence_level', 0):.1%}\n"
-                        response += f"• Market Factors: {details.get('market_factors', 'N/A')}\n"
-                    response += "\n"
+                        parts.append(f"• Predicted Weekly Demand: {details.get('predicted_demand', 0)} units\n")
+                        parts.append(f"• Confidence Level: {details.get('confidence_level', 0):.1%}\n")
+                        parts.append(f"• Market Factors: {details.get('market_factors', 'N/A')}\n")
+                    parts.append("\n")
                 
                 # Pricing Optimization
                 if 'pricing_optimization' in results:
                     pricing_data = results['pricing_optimization']
-                    response += "💰 **Pricing Optimization:**\n"
-                    response += f"• Status: {pricing_data.get('status', 'Unknown')}\n"
+                    parts.append("💰 **Pricing Optimization:**\n")
+                    parts.append(f"• Status: {pricing_data.get('status', 'Unknown')}\n")
                     if 'details' in pricing_data:
                         details = pricing_data['details']
-                        response += f"• Recommended Price: ${details.get('recommended_price', 0):.2f}\n"
-                        response += f"• Cost Analysis: ${details.get('cost_analysis', 0):.2f}\n"
-                        response += f"• Profit Margin: {details.get('profit_margin', 0):.1%}\n"
+                        parts.append(f"• Recommended Price: ${details.get('recommended_price', 0):.2f}\n")
+                        parts.append(f"• Cost Analysis: ${details.get('cost_analysis', 0):.2f}\n")
+                        parts.append(f"• Profit Margin: {details.get('profit_margin', 0):.1%}\n")
                         if 'strategy_details' in details:
                             strategy = details['strategy_details']
-                            response += f"• Strategy: {strategy.get('strategy', 'N/A')}\n"
-                    response += "\n"
+                            parts.append(f"• Strategy: {strategy.get('strategy', 'N/A')}\n")
+                    parts.append("\n")
                 
                 # Nutrition Analysis
                 if 'nutrition_analysis' in results:
                     nutrition_data = results['nutrition_analysis']
-                    response += "🥗 **Nutrition Analysis:**\n"
-                    response += f"• Status: {nutrition_data.get('status', 'Unknown')}\n"
+                    parts.append("🥗 **Nutrition Analysis:**\n")
+                    parts.append(f"• Status: {nutrition_data.get('status', 'Unknown')}\n")
                     if 'details' in nutrition_data:
                         details = nutrition_data['details']
-                        response += f"• Calories: {details.get('calories', 0)} kcal\n"
-                        response += f"• Protein: {details.get('protein', 0):.1f}g\n"
-                        response += f"• Carbs: {details.get('carbohydrates', 0):.1f}g\n"
-                        response += f"• Fat: {details.get('fat', 0):.1f}g\n"
-                        response += f"• Health Score: {details.get('health_score', 0):.1f}/10\n"
-                    response += "\n"
+                        parts.append(f"• Calories: {details.get('calories', 0)} kcal\n")
+                        parts.append(f"• Protein: {details.get('protein', 0):.1f}g\n")
+                        parts.append(f"• Carbs: {details.get('carbohydrates', 0):.1f}g\n")
+                        parts.append(f"• Fat: {details.get('fat', 0):.1f}g\n")
+                        parts.append(f"• Health Score: {details.get('health_score', 0):.1f}/10\n")
+                    parts.append("\n")
                 
                 # Inventory Impact
                 if 'inventory_impact' in results:
                     inventory_data = results['inventory_impact']
-                    response += "📦 **Inventory Impact:**\n"
-                    response += f"• Status: {inventory_data.get('status', 'Unknown')}\n"
+                    parts.append("📦 **Inventory Impact:**\n")
+                    parts.append(f"• Status: {inventory_data.get('status', 'Unknown')}\n")
                     if 'details' in inventory_data:
                         details = inventory_data['details']
-                        response += f"• Ingredient Availability: {details.get('availability_status', 'Unknown')}\n"
+                        parts.append(f"• Ingredient Availability: {details.get('availability_status', 'Unknown')}\n")
                         if 'required_ingredients' in details:
-                            response += "• Required Ingredients:\n"
+                            parts.append("• Required Ingredients:\n")
                             for ingredient in details['required_ingredients'][:5]:  # Show first 5
-                                response += f"  - {ingredient.get('name', 'Unknown')}: {ingredient.get('quantity', 0)} {ingredient.get('unit', '')}\n"
-                    response += "\n"
+                                parts.append(f"  - {ingredient.get('name', 'Unknown')}: {ingredient.get('quantity', 0)} {ingredient.get('unit', '')}\n")
+                    parts.append("\n")
                 
                 # Recommendations
                 if 'recommendations' in results:
-                    response += "💡 **Key Recommendations:**\n"
+                    parts.append("💡 **Key Recommendations:**\n")
                     for i, rec in enumerate(results['recommendations'][:5], 1):
-                        response += f"{i}. {rec}\n"
-                    response += "\n"
+                        parts.append(f"{i}. {rec}\n")
+                    parts.append("\n")
             
-            response += "✅ **Analysis Complete** - All workflow steps have been processed successfully!"
+            parts.append("✅ **Analysis Complete** - All workflow steps have been processed successfully!")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'workflow_details',
                 'data': workflow_data
             }
@@ -2720,18 +2867,19 @@ Please provide a helpful response:
     def _handle_ai_dish_creation(self, message):
         """Handle AI-powered dish creation requests"""
         try:
-            # Extract parameters from message
-            ingredients = self._extract_ingredients_from_message(message)
-            dietary_preferences = self._extract_dietary_preferences(message)
-            cuisine_style = self._extract_cuisine_style(message)
+            # Extract parameters from message, lower-casing it once for every extractor
+            message_lower = message.lower()
+            ingredients = self._extract_ingredients_from_message(message, message_lower)
+            dietary_preferences = self._extract_dietary_preferences(message, message_lower)
+            cuisine_style = self._extract_cuisine_style(message, message_lower)
             
             # Determine creativity level from message
             creativity_level = 0.8  # Default high creativity
-            if 'traditional' in message.lower():
+            if 'traditional' in message_lower:
                 creativity_level = 0.3
-            elif 'fusion' in message.lower():
+            elif 'fusion' in message_lower:
                 creativity_level = 0.6
-            elif 'innovative' in message.lower() or 'creative' in message.lower():
+            elif 'innovative' in message_lower or 'creative' in message_lower:
                 creativity_level = 0.9
             
             if not ingredients:
@@ -2757,87 +2905,85 @@ Please provide a helpful response:
                 for step_name, step_data in workflow_results['results']['results'].items():
                     if 'dish_name' in step_data:
                         # Create a simple dish object from the step data
-                        dish_suggestion = type('DishSuggestion', (), {
-                            'name': step_data.get('dish_name', 'AI Generated Dish'),
-                            'description': step_data.get('description', 'An innovative fusion dish'),
-                            'category': 'main_course',
-                            'cuisine_type': 'Fusion',
-                            'ingredients': ingredients,
-                            'estimated_cost': 12.0,
-                            'suggested_price': 22.0,
-                            'predicted_demand': 30.0,
-                            'nutrition_score': 0.8,
-                            'creativity_score': 0.85,
-                            'feasibility_score': 0.8,
-                            'overall_score': 0.82
-                        })()
+                        dish_suggestion = DishSuggestion(
+                            name=step_data.get('dish_name', 'AI Generated Dish'),
+                            description=step_data.get('description', 'An innovative fusion dish'),
+                            category='main_course',
+                            cuisine_type='Fusion',
+                            ingredients=ingredients,
+                            estimated_cost=12.0,
+                            suggested_price=22.0,
+                            predicted_demand=30.0,
+                            nutrition_score=0.8,
+                            creativity_score=0.85,
+                            feasibility_score=0.8,
+                            overall_score=0.82
+                        )
                         break
             
             # Fallback if no dish found in results
             if not dish_suggestion:
                 main_ingredient = ingredients[0] if ingredients else 'Mixed Ingredients'
-                dish_suggestion = type('DishSuggestion', (), {
-                    'name': f'AutoGen {main_ingredient.title()} Fusion',
-                    'description': f'An innovative dish featuring {', '.join(ingredients[:3])}',
-                    'category': 'main_course',
-                    'cuisine_type': 'Fusion',
-                    'ingredients': ingredients,
-                    'estimated_cost': 12.0,
-                    'suggested_price': 22.0,
-                    'predicted_demand': 30.0,
-                    'nutrition_score': 0.8,
-                    'creativity_score': 0.85,
-                    'feasibility_score': 0.8,
-                    'overall_score': 0.82
-                })()
+                ingredients_preview = ', '.join(ingredients[:3])
+                dish_suggestion = DishSuggestion(
+                    name=f'AutoGen {main_ingredient.title()} Fusion',
+                    description=f'An innovative dish featuring {ingredients_preview}',
+                    category='main_course',
+                    cuisine_type='Fusion',
+                    ingredients=ingredients,
+                    estimated_cost=12.0,
+                    suggested_price=22.0,
+                    predicted_demand=30.0,
+                    nutrition_score=0.8,
+                    creativity_score=0.85,
+                    feasibility_score=0.8,
+                    overall_score=0.82
+                )
             
             # Format detailed response
-            response = f"🤖 **AI DISH CREATION**\n\n"
-            response += f"**🍽️ Dish Name:** {dish_suggestion.name}\n"
-            response += f"**📝 Description:** {dish_suggestion.description}\n"
-            response += f"**🏷️ Category:** {dish_suggestion.category}\n"
-            response += f"**🌍 Cuisine:** {dish_suggestion.cuisine_type}\n\n"
-            
-            response += f"**💰 Pricing Analysis:**\n"
-            response += f"• Estimated Cost: ${dish_suggestion.estimated_cost:.2f}\n"
-            response += f"• Suggested Price: ${dish_suggestion.suggested_price:.2f}\n"
-            response += f"• Profit Margin: {((dish_suggestion.suggested_price - dish_suggestion.estimated_cost) / dish_suggestion.suggested_price * 100):.1f}%\n\n"
-            
-            response += f"**📊 AI Analysis:**\n"
-            response += f"• Creativity Score: {dish_suggestion.creativity_score:.1f}/1.0\n"
-            response += f"• Feasibility Score: {dish_suggestion.feasibility_score:.1f}/1.0\n"
-            response += f"• Nutrition Score: {dish_suggestion.nutrition_score:.1f}/1.0\n"
-            response += f"• Predicted Demand: {dish_suggestion.predicted_demand:.0f} units/week\n\n"
+            estimated_cost = dish_suggestion.estimated_cost
+            suggested_price = dish_suggestion.suggested_price
+            profit_margin = (suggested_price - estimated_cost) / suggested_price * 100
+            
+            parts = [
+                f"🤖 **AI DISH CREATION**\n\n"
+                f"**🍽️ Dish Name:** {dish_suggestion.name}\n"
+                f"**📝 Description:** {dish_suggestion.description}\n"
+                f"**🏷️ Category:** {dish_suggestion.category}\n"
+                f"**🌍 Cuisine:** {dish_suggestion.cuisine_type}\n\n"
+            ]
+            
+            parts.append(
+                f"**💰 Pricing Analysis:**\n"
+                f"• Estimated Cost: ${estimated_cost:.2f}\n"
+                f"• Suggested Price: ${suggested_price:.2f}\n"
+                f"• Profit Margin: {profit_margin:.1f}%\n\n"
+            )
+            
+            parts.append(
+                f"**📊 AI Analysis:**\n"
+                f"• Creativity Score: {dish_suggestion.creativity_score:.1f}/1.0\n"
+                f"• Feasibility Score: {dish_suggestion.feasibility_score:.1f}/1.0\n"
+                f"• Nutrition Score: {dish_suggestion.nutrition_score:.1f}/1.0\n"
+                f"• Predicted Demand: {dish_suggestion.predicted_demand:.0f} units/week\n\n"
+            )
             
             if dish_suggestion.recipe_instructions:
-                response += f"**👨‍🍳 Recipe Instructions:**\n{dish_suggestion.recipe_instructions[:200]}...\n\n"
+                parts.append(f"**👨‍🍳 Recipe Instructions:**\n{dish_suggestion.recipe_instructions[:200]}...\n\n")
             
-            response += "**🚀 Next Steps:**\n"
-            response += "• Type 'automate workflow' to run full analysis\n"
-            response += "• Type 'auto apply' to add to menu\n"
-            response += "• Type 'modify dish' to adjust parameters"
+            parts.append(
+                "**🚀 Next Steps:**\n"
+                "• Type 'automate workflow' to run full analysis\n"
+                "• Type 'auto apply' to add to menu\n"
+                "• Type 'modify dish' to adjust parameters"
+            )
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'ai_dish_creation',
                 'data': {
                     'mode': 'INNOVATION',
-                    'dish_suggestion': {
-                        'name': dish_suggestion.name,
-                        'description': dish_suggestion.description,
-                        'category': dish_suggestion.category,
-                        'cuisine_type': dish_suggestion.cuisine_type,
-                        'ingredients': dish_suggestion.ingredients,
-                        'estimated_cost': dish_suggestion.estimated_cost,
-                        'suggested_price': dish_suggestion.suggested_price,
-                        'predicted_demand': dish_suggestion.predicted_demand,
-                        'creativity_score': dish_suggestion.creativity_score,
-                        'feasibility_score': dish_suggestion.feasibility_score,
-                        'nutrition_score': dish_suggestion.nutrition_score,
-                        'overall_score': dish_suggestion.overall_score,
-                        'recipe_instructions': dish_suggestion.recipe_instructions,
-                        'nutrition_data': dish_suggestion.nutrition_data
-                    },
+                    'dish_suggestion': {field: getattr(dish_suggestion, field) for field in _DISH_SUGGESTION_FIELDS},
                     'ui_update': 'show_ai_dish_creation'
                 }
             }
@@ -2852,10 +2998,12 @@ Please provide a helpful response:
     def _generate_ai_powered_dish_suggestions(self, message):
         """Generate AI-powered dish suggestions based on inventory"""
         try:
-            # Get high-inventory items
-            inventory_items = InventoryItem.query.filter(InventoryItem.quantity > 20).limit(8).all()
+            # Get high-inventory items, joining the ingredient names in the same query
+            inventory_rows = db.session.query(Ingredient.name, InventoryItem.quantity).select_from(InventoryItem).join(
+                Ingredient, InventoryItem.ingredient_id == Ingredient.id
+            ).filter(InventoryItem.quantity > 20).limit(8).all()
             
-            if not inventory_items:
+            if not inventory_rows:
                 return {
                     'response': "🤖 **AI INVENTORY ANALYSIS**\n\nNo high-inventory items found. Please check your inventory levels.",
                     'type': 'inventory_error'
@@ -2863,71 +3011,96 @@ Please provide a helpful response:
             
             # Create multiple dish suggestions
             suggestions = []
-            ingredients_list = [item.ingredient.name for item in inventory_items if item.ingredient]
+            ingredients_list = [name for name, _ in inventory_rows]
             
-            # Generate 3 different dish concepts
+            # Generate 3 different dish concepts from different ingredient combinations
+            concepts = []
             for i in range(3):
-                # Use different ingredient combinations
                 selected_ingredients = ingredients_list[i*2:(i*2)+4] if len(ingredients_list) > i*2+3 else ingredients_list[:4]
-                
+                concepts.append((selected_ingredients, tuple(sorted(name.lower() for name in selected_ingredients))))
+            
+            # Run the AutoGen AI Agent workflow once per distinct combination (with fewer
+            # than six high-inventory items the concepts reuse the same one), concurrently
+            workflow_inputs = {}
+            for selected_ingredients, workflow_key in concepts:
                 if selected_ingredients:
-                    # Use AutoGen AI Agent workflow
-                    workflow_results = self.ai_agent.automate_full_workflow(
-                        ingredients=selected_ingredients,
+                    workflow_inputs.setdefault(workflow_key, selected_ingredients)
+            
+            app = current_app._get_current_object()
+            
+            def run_workflow(selected_ingredients):
+                # Worker threads need their own app context, and with it their own DB session
+                with app.app_context():
+                    return self.ai_agent.automate_full_workflow(
+                        ingredients=list(selected_ingredients),
                         auto_apply=True  # Enable auto-apply for database insertions
                     )
+            
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                workflow_runs = dict(zip(workflow_inputs, executor.map(run_workflow, workflow_inputs.values())))
+            
+            for i, (selected_ingredients, workflow_key) in enumerate(concepts):
+                if selected_ingredients:
+                    workflow_results = workflow_runs[workflow_key]
                     
                     # Extract dish suggestion from workflow results
                     dish_suggestion = None
                     if 'results' in workflow_results and 'results' in workflow_results['results']:
                         for step_name, step_data in workflow_results['results']['results'].items():
                             if 'dish_name' in step_data:
-                                dish_suggestion = type('DishSuggestion', (), {
-                                    'name': step_data.get('dish_name', f'AutoGen {selected_ingredients[0].title()} Dish'),
-                                    'description': step_data.get('description', 'An innovative fusion dish'),
-                                    'ingredients': selected_ingredients,
-                                    'suggested_price': 18.0 + (i * 2.0),
-                                    'creativity_score': 0.7 + (i * 0.1),
-                                    'predicted_demand': 25.0 + (i * 5.0),
-                                    'overall_score': 0.8 + (i * 0.05)
-                                })()
+                                dish_suggestion = DishSuggestion(
+                                    name=step_data.get('dish_name', f'AutoGen {selected_ingredients[0].title()} Dish'),
+                                    description=step_data.get('description', 'An innovative fusion dish'),
+                                    category='main_course',
+                                    cuisine_type='Fusion',
+                                    ingredients=selected_ingredients,
+                                    estimated_cost=12.0,
+                                    suggested_price=18.0 + (i * 2.0),
+                                    creativity_score=0.7 + (i * 0.1),
+                                    predicted_demand=25.0 + (i * 5.0),
+                                    overall_score=0.8 + (i * 0.05)
+                                )
                                 break
                     
                     # Fallback if no dish found
                     if not dish_suggestion:
-                        dish_suggestion = type('DishSuggestion', (), {
-                            'name': f'AutoGen {selected_ingredients[0].title()} Special',
-                            'description': f'Creative dish using {', '.join(selected_ingredients[:2])}',
-                            'ingredients': selected_ingredients,
-                            'suggested_price': 18.0 + (i * 2.0),
-                            'creativity_score': 0.7 + (i * 0.1),
-                            'predicted_demand': 25.0 + (i * 5.0),
-                            'overall_score': 0.8 + (i * 0.05)
-                        })()
+                        selected_preview = ', '.join(selected_ingredients[:2])
+                        dish_suggestion = DishSuggestion(
+                            name=f'AutoGen {selected_ingredients[0].title()} Special',
+                            description=f'Creative dish using {selected_preview}',
+                            category='main_course',
+                            cuisine_type='Fusion',
+                            ingredients=selected_ingredients,
+                            estimated_cost=12.0,
+                            suggested_price=18.0 + (i * 2.0),
+                            creativity_score=0.7 + (i * 0.1),
+                            predicted_demand=25.0 + (i * 5.0),
+                            overall_score=0.8 + (i * 0.05)
+                        )
                     
                     suggestions.append(dish_suggestion)
             
             # Format response
-            response = f"🤖 **AI INVENTORY OPTIMIZATION**\n\n"
-            response += f"**📦 High Inventory Items:** {', '.join([item.ingredient.name for item in inventory_items[:5] if item.ingredient])}\n\n"
+            parts = [f"🤖 **AI INVENTORY OPTIMIZATION**\n\n"]
+            parts.append(f"**📦 High Inventory Items:** {', '.join(ingredients_list[:5])}\n\n")
             
             for i, suggestion in enumerate(suggestions, 1):
-                response += f"**{i}. {suggestion.name}**\n"
-                response += f"   • Ingredients: {', '.join(suggestion.ingredients[:3])}\n"
-                response += f"   • Price: ${suggestion.suggested_price:.2f}\n"
-                response += f"   • Demand: {suggestion.predicted_demand:.0f} units/week\n"
-                response += f"   • AI Score: {suggestion.overall_score:.1f}/1.0\n\n"
+                parts.append(f"**{i}. {suggestion.name}**\n")
+                parts.append(f"   • Ingredients: {', '.join(suggestion.ingredients[:3])}\n")
+                parts.append(f"   • Price: ${suggestion.suggested_price:.2f}\n")
+                parts.append(f"   • Demand: {suggestion.predicted_demand:.0f} units/week\n")
+                parts.append(f"   • AI Score: {suggestion.overall_score:.1f}/1.0\n\n")
             
-            response += "**🚀 Actions:**\n"
-            response += "• Type 'automate workflow [dish name]' for full analysis\n"
-            response += "• Type 'ai create [specific ingredients]' for custom dish"
+            parts.append("**🚀 Actions:**\n")
+            parts.append("• Type 'automate workflow [dish name]' for full analysis\n")
+            parts.append("• Type 'ai create [specific ingredients]' for custom dish")
             
             return {
-                'response': response,
+                'response': "".join(parts),
                 'type': 'ai_inventory_suggestions',
                 'data': {
                     'mode': 'INNOVATION',
-                    'inventory_items': [{'name': item.ingredient.name, 'quantity': item.quantity} for item in inventory_items if item.ingredient],
+                    'inventory_items': [{'name': name, 'quantity': quantity} for name, quantity in inventory_rows],
                     'suggestions': [{
                         'name': s.name,
                         'description': s.description,
@@ -2947,131 +3120,76 @@ Please provide a helpful response:
                 'type': 'ai_inventory_error'
             }
     
-    def _extract_ingredients_from_message(self, message):
+    def _extract_ingredients_from_message(self, message, message_lower=None):
         """Extract ingredient names from user message"""
         try:
-            ingredients = []
-            message_lower = message.lower()
+            if message_lower is None:
+                message_lower = message.lower()
             
-            # Get all available ingredients from database
-            available_ingredients = Ingredient.query.all()
-            
-            # Check which ingredients are mentioned
-            for ingredient in available_ingredients:
-                if ingredient.name.lower() in message_lower:
-                    ingredients.append(ingredient.name)
-            
-            # Also check inventory items
-            inventory_items = InventoryItem.query.all()
-            for item in inventory_items:
-                if item.ingredient and item.ingredient.name.lower() in message_lower and item.ingredient.name not in ingredients:
-                    ingredients.append(item.ingredient.name)
-            
-            return ingredients[:8]  # Limit to 8 ingredients
+            # Inventory items always reference an ingredient, so matching the
+            # ingredient names covers them too
+            ingredients = _mentioned_ingredient_names(_ingredient_names_version, message_lower)
+            return list(ingredients[:8])  # Limit to 8 ingredients
             
         except Exception as e:
             logger.error(f"Error extracting ingredients: {str(e)}")
             return []
     
-    def _extract_dietary_preferences(self, message):
+    def _extract_dietary_preferences(self, message, message_lower=None):
         """Extract dietary preferences from user message"""
-        preferences = []
-        message_lower = message.lower()
-        
-        dietary_keywords = {
-            'vegetarian': ['vegetarian', 'veggie'],
-            'vegan': ['vegan'],
-            'gluten-free': ['gluten free', 'gluten-free', 'no gluten'],
-            'low-carb': ['low carb', 'low-carb', 'keto'],
-            'healthy': ['healthy', 'nutritious', 'light'],
-            'spicy': ['spicy', 'hot', 'chili']
-        }
-        
-        for preference, keywords in dietary_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
-                preferences.append(preference)
-        
-        return preferences
+        if message_lower is None:
+            message_lower = message.lower()
+        matched = _match_keywords(_DIETARY_MATCHER, message_lower)
+        return [_DIETARY_KEYWORDS[index][0] for index in sorted(matched)]
     
     def _extract_dish_name_from_message(self, message):
         """Extract dish name from user message"""
-        import re
-        
-        # Look for quoted dish names
-        quoted_match = re.search(r'"([^"]+)"', message)
+        # Look for quoted dish names (this also covers 'for "..."' and 'create "..."')
+        quoted_match = _QUOTED_DISH_NAME_RE.search(message)
         if quoted_match:
             return quoted_match.group(1)
         
-        # Look for "for [dish name]" pattern
-        for_pattern = re.search(r'for\s+"([^"]+)"', message, re.IGNORECASE)
-        if for_pattern:
-            return for_pattern.group(1)
-        
-        # Look for dish names after "workflow for" or "create"
-        workflow_pattern = re.search(r'(?:workflow for|create)\s+"([^"]+)"', message, re.IGNORECASE)
-        if workflow_pattern:
-            return workflow_pattern.group(1)
-        
         # Look for common dish name patterns (capitalized words)
-        dish_pattern = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Risotto|Bowl|Salad|Soup|Pasta|Pizza|Burger|Sandwich)))', message)
+        dish_pattern = _CAPITALIZED_DISH_NAME_RE.search(message)
         if dish_pattern:
             return dish_pattern.group(1)
         
         return None
     
-    def _extract_cuisine_style(self, message):
+    def _extract_cuisine_style(self, message, message_lower=None):
         """Extract cuisine style from user message"""
-        message_lower = message.lower()
-        
-        cuisine_keywords = {
-            'Italian': ['italian', 'pasta', 'pizza'],
-            'Asian': ['asian', 'chinese', 'japanese', 'thai'],
-            'Mexican': ['mexican', 'taco', 'burrito'],
-            'Mediterranean': ['mediterranean', 'greek'],
-            'French': ['french'],
-            'Indian': ['indian', 'curry'],
-            'American': ['american', 'burger']
-        }
-        
-        for cuisine, keywords in cuisine_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
-                return cuisine
+        if message_lower is None:
+            message_lower = message.lower()
+        matched = _match_keywords(_CUISINE_MATCHER, message_lower)
+        if matched:
+            return _CUISINE_KEYWORDS[min(matched)][0]
         
         return None  # Let AI Agent decide
 
 # Initialize the agent
 agent = RestaurantIntelligenceAgent()
 
+# Replies that only read data, served again for an identical message within the TTL.
+# Nothing invalidates them early, so the TTL bounds how stale the figures can get.
+_CACHEABLE_RESPONSE_TYPES = frozenset({
+    'nutrition', 'nutrition_missing', 'nutrition_overview', 'menu_info', 'dish_category_info',
+    'pricing_info', 'demand_info', 'inventory_info', 'greeting', 'acknowledgment', 'farewell',
+    'personal', 'introduction', 'help', 'redirect', 'general'
+})
+_RESPONSE_CACHE_TTL = 30  # seconds
+_RESPONSE_CACHE_SIZE = 1024
+_RESPONSE_CACHE_KEY_LENGTH = 256  # characters of the message used in the cache key
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
 @chatbot_bp.route('/message', methods=['POST'])
 def handle_message():
     """Handle incoming chatbot messages"""
-    print("HANDLE_MESSAGE CALLED - CONSOLE OUTPUT")
     try:
-        # Debug to file
-        with open('C:\\Users\\User\\Desktop\\first-app\\debug_log.txt', 'a', encoding='utf-8') as f:
-            f.write("DEBUG: Message endpoint reached\n")
-            f.flush()
-        
-        logging.info("DEBUG: Message endpoint reached")
         data = request.get_json()
-        
-        with open('C:\\Users\\User\\Desktop\\first-app\\debug_log.txt', 'a', encoding='utf-8') as f:
-            f.write(f"DEBUG: Request data: {data}\n")
-            f.flush()
-            
-        logging.info(f"DEBUG: Request data received")
         message = data.get('message', '').strip()
         category = data.get('category', '')  # Extract category from request
-        
-        with open('C:\\Users\\User\\Desktop\\first-app\\debug_log.txt', 'a', encoding='utf-8') as f:
-            f.write(f"DEBUG: Extracted message: {message}\n")
-            f.write(f"DEBUG: Extracted category: {category}\n")
-            f.flush()
-            
-        # Log message safely without potential Unicode issues
-        safe_message = message.encode('ascii', 'ignore').decode('ascii') if message else 'empty'
-        logging.info(f"DEBUG: Extracted message: {safe_message[:100]}...")
-        logging.info(f"DEBUG: Extracted category: {category}")
+        logger.debug("Extracted message: %.100s... (category: %s)", message or 'empty', category)
         context = data.get('context', [])
         intelligence_mode = data.get('intelligence_mode', data.get('mode', 'INSIGHTS'))  # Get mode from frontend
         
@@ -3081,8 +3199,33 @@ def handle_message():
                 'error': 'Message is required'
             }), 400
         
-        # Process the message with intelligence mode and category
-        result = agent.process_message(message, context, intelligence_mode, category)
+        # Process the message with intelligence mode and category, unless the same
+        # read-only question was just answered
+        cache_key = None
+        if isinstance(category, str) and isinstance(intelligence_mode, str):
+            # Keep only a prefix of long pastes in the key; the full-text hash keeps keys distinct
+            message_lower = message.lower()
+            cache_key = (message_lower[:_RESPONSE_CACHE_KEY_LENGTH], hash(message_lower), intelligence_mode, category)
+        cached = None
+        if cache_key is not None:
+            with _response_cache_lock:
+                cached = _response_cache.get(cache_key)
+                if cached is not None and cached[0] > time.monotonic():
+                    _response_cache.move_to_end(cache_key)
+                else:
+                    cached = None
+        if cached is not None:
+            _, result, agent.mode = cached
+            if intelligence_mode:
+                agent.intelligence_mode = intelligence_mode
+        else:
+            result = agent.process_message(message, context, intelligence_mode, category)
+            if cache_key is not None and result.get('type') in _CACHEABLE_RESPONSE_TYPES:
+                with _response_cache_lock:
+                    _response_cache[cache_key] = (time.monotonic() + _RESPONSE_CACHE_TTL, result, agent.mode)
+                    _response_cache.move_to_end(cache_key)
+                    while len(_response_cache) > _RESPONSE_CACHE_SIZE:
+                        _response_cache.popitem(last=False)
         
         return jsonify({
             'success': True,
@@ -3093,9 +3236,7 @@ def handle_message():
         })
         
     except Exception as e:
-        # Handle Unicode characters safely in error logging
-        error_msg = str(e).encode('ascii', 'ignore').decode('ascii')
-        logger.error(f"Chatbot message error: {error_msg}")
+        logger.error("Chatbot message error: %s", e)
         return jsonify({
             'success': False,
             'error': 'Internal server error',
@@ -3106,12 +3247,18 @@ def handle_message():
 def get_status():
     """Get chatbot status and capabilities"""
     try:
-        # Get system statistics
+        # Get system statistics, all four counts in one round trip
+        menu_items, ingredients, orders, nutrition_coverage = db.session.query(
+            db.session.query(func.count()).select_from(MenuItem).scalar_subquery(),
+            db.session.query(func.count()).select_from(InventoryItem).scalar_subquery(),
+            db.session.query(func.count()).select_from(CustomerOrder).scalar_subquery(),
+            db.session.query(func.count()).select_from(MenuItem).join(MenuNutrition).scalar_subquery()
+        ).one()
         stats = {
-            'menu_items': MenuItem.query.count(),
-            'ingredients': InventoryItem.query.count(),
-            'orders': CustomerOrder.query.count(),
-            'nutrition_coverage': db.session.query(MenuItem).join(MenuNutrition).count()
+            'menu_items': menu_items,
+            'ingredients': ingredients,
+            'orders': orders,
+            'nutrition_coverage': nutrition_coverage
         }
         
         return jsonify({
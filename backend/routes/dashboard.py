@@ -8,19 +8,29 @@ from models.recipe import Recipe
 from models.menu_nutrition import MenuNutrition
 from models.menu_item_image import MenuItemImage
 from models.stock_alert import StockAlert
+from models.daily_order_stats import DailyOrderStats
+from models.menu_item_order_counts import MenuItemOrderCounts
+from routes.order import convert_recipe_to_inventory_unit
+from utils.response_cache import cached_response, etagged
 from sqlalchemy import func, text
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import attrgetter
 from models import db
 import logging
+import random
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
 @dashboard_bp.route('/orders', methods=['GET'])
 @cross_origin(origins="*")
+@etagged()
+@cached_response(timeout=30)
 def get_dashboard_orders():
     """Get recent orders for dashboard display"""
     try:
-        # Get recent orders (last 10) with menu item details
+        # Get the 5 most recent orders with menu item details; order_number is unique per
+        # row, so each row is already one dashboard order and needs no grouping
         orders = db.session.query(
             CustomerOrder.id,
             CustomerOrder.order_number,
@@ -28,48 +38,22 @@ def get_dashboard_orders():
             CustomerOrder.total_price,
             CustomerOrder.order_status,
             CustomerOrder.order_date,
-            CustomerOrder.customer_name,
             MenuItem.menu_item_name
         ).join(
             MenuItem, CustomerOrder.menu_item_id == MenuItem.id
         ).order_by(
             CustomerOrder.order_date.desc()
-        ).limit(10).all()
-        
-        # Group orders by order_number to combine items
-        order_groups = {}
-        for order in orders:
-            order_num = order.order_number
-            if order_num not in order_groups:
-                order_groups[order_num] = {
-                    'id': order.id,
-                    'orderNumber': order_num,
-                    'tableNumber': f"Table {(order.id % 20) + 1}",  # Simulate table numbers
-                    'items': [],
-                    'total': 0,
-                    'status': order.order_status,
-                    'time': order.order_date.strftime('%H:%M') if order.order_date else '',
-                    'customer': order.customer_name or 'Guest'
-                }
-            
-            order_groups[order_num]['items'].append({
-                'name': order.menu_item_name,
-                'quantity': order.quantity_ordered
-            })
-            order_groups[order_num]['total'] += order.total_price
-        
-        # Convert to list and format
-        formatted_orders = []
-        for order_data in list(order_groups.values())[:5]:  # Limit to 5 for dashboard
-            formatted_orders.append({
-                'id': order_data['id'],
-                'orderNumber': order_data['orderNumber'],
-                'tableNumber': order_data['tableNumber'],
-                'items': ', '.join([f"{item['name']} x{item['quantity']}" for item in order_data['items']]),
-                'total': f"{order_data['total']:.2f}",
-                'status': order_data['status'],
-                'time': order_data['time']
-            })
+        ).limit(5).all()
+        
+        formatted_orders = [{
+            'id': order.id,
+            'orderNumber': order.order_number,
+            'tableNumber': f"Table {(order.id % 20) + 1}",  # Simulate table numbers
+            'items': f"{order.menu_item_name} x{order.quantity_ordered}",
+            'total': f"{order.total_price:.2f}",
+            'status': order.order_status,
+            'time': order.order_date.strftime('%H:%M') if order.order_date else ''
+        } for order in orders]
         
         return jsonify(formatted_orders), 200
         
@@ -79,14 +63,25 @@ def get_dashboard_orders():
 
 @dashboard_bp.route('/pending-menu', methods=['GET'])
 @cross_origin(origins="*")
+@etagged()
+@cached_response(timeout=30)
 def get_pending_menu_items():
     """Get menu items that are missing essential information"""
     try:
         # Find menu items missing nutrition info, pricing, or recipes
         pending_items = []
         
-        # Get all menu items
-        menu_items = MenuItem.query.all()
+        # Get all menu items with image, nutrition and recipe presence in one query
+        has_image = db.session.query(MenuItemImage.id).filter(MenuItemImage.menu_item_id == MenuItem.id).exists()
+        has_nutrition = db.session.query(MenuNutrition.id).filter(MenuNutrition.menu_item_id == MenuItem.id).exists()
+        has_recipe = db.session.query(Recipe.id).filter(Recipe.dish_id == MenuItem.id).exists()
+        menu_items = db.session.query(
+            MenuItem.menu_item_name,
+            MenuItem.menu_price,
+            has_image.label('has_image'),
+            has_nutrition.label('has_nutrition'),
+            has_recipe.label('has_recipe')
+        ).all()
         
         for item in menu_items:
             missing_components = []
@@ -96,18 +91,15 @@ def get_pending_menu_items():
                 missing_components.append('Price')
             
             # Check for missing images
-            images = MenuItemImage.query.filter_by(menu_item_id=item.id).all()
-            if not images:
+            if not item.has_image:
                 missing_components.append('Image')
             
             # Check for missing nutrition info
-            nutrition = MenuNutrition.query.filter_by(menu_item_id=item.id).first()
-            if not nutrition:
+            if not item.has_nutrition:
                 missing_components.append('Nutrition Info')
             
             # Check for missing recipes
-            recipes = Recipe.query.filter_by(dish_id=item.id).all()
-            if not recipes:
+            if not item.has_recipe:
                 missing_components.append('Recipe')
             
             if missing_components:
@@ -126,52 +118,70 @@ def get_pending_menu_items():
 
 @dashboard_bp.route('/unavailable-items', methods=['GET'])
 @cross_origin(origins="*")
+@etagged()
+@cached_response(timeout=30)
 def get_unavailable_items():
     """Get menu items that are unavailable due to low stock"""
     try:
         unavailable_items = []
         
-        # Get all menu items
-        menu_items = MenuItem.query.all()
-        
-        for menu_item in menu_items:
-            # Get recipes for this menu item
-            recipes = Recipe.query.filter_by(dish_id=menu_item.id).all()
-            
-            is_available = True
+        # Get every recipe line with its ingredient and inventory stock in one query
+        recipe_rows = db.session.query(
+            MenuItem.id.label('menu_item_id'),
+            MenuItem.menu_item_name,
+            Recipe.id.label('recipe_id'),
+            Recipe.ingredient_id,
+            Recipe.quantity_per_unit,
+            Recipe.recipe_unit,
+            Ingredient.name.label('ingredient_name'),
+            Ingredient.unit,
+            InventoryItem.id.label('inventory_id'),
+            InventoryItem.quantity
+        ).select_from(MenuItem).join(
+            Recipe, Recipe.dish_id == MenuItem.id
+        ).outerjoin(
+            Ingredient, Ingredient.id == Recipe.ingredient_id
+        ).outerjoin(
+            InventoryItem, InventoryItem.ingredient_id == Recipe.ingredient_id
+        ).order_by(MenuItem.id, Recipe.id, InventoryItem.id).all()
+        
+        for (menu_item_id, menu_item_name), rows in groupby(recipe_rows, key=attrgetter('menu_item_id', 'menu_item_name')):
             missing_ingredients = []
+            checked_recipes = set()
             
-            for recipe in recipes:
-                # Check if ingredient has sufficient stock
-                inventory = InventoryItem.query.filter_by(ingredient_id=recipe.ingredient_id).first()
-                ingredient = Ingredient.query.get(recipe.ingredient_id)
+            for row in rows:
+                # Only the first inventory record of an ingredient is checked
+                if row.recipe_id in checked_recipes:
+                    continue
+                checked_recipes.add(row.recipe_id)
                 
-                if not inventory or not ingredient:
-                    is_available = False
-                    missing_ingredients.append(ingredient.name if ingredient else f'Ingredient {recipe.ingredient_id}')
+                # Check if ingredient has sufficient stock
+                if row.inventory_id is None or row.ingredient_name is None:
+                    missing_ingredients.append(row.ingredient_name or f'Ingredient {row.ingredient_id}')
                 else:
                     # Convert recipe quantity to inventory unit for proper comparison
-                    from routes.order import convert_recipe_to_inventory_unit
+                    # (the row carries the ingredient's unit)
                     converted_required = convert_recipe_to_inventory_unit(
-                        recipe.quantity_per_unit, 
-                        recipe.recipe_unit, 
-                        ingredient
+                        row.quantity_per_unit, 
+                        row.recipe_unit, 
+                        row
                     )
                     
-                    if float(inventory.quantity) < converted_required:
-                        is_available = False
-                        missing_ingredients.append(ingredient.name)
+                    if float(row.quantity) < converted_required:
+                        missing_ingredients.append(row.ingredient_name)
             
-            if not is_available:
+            if missing_ingredients:
                 reason = f"Low stock: {', '.join(missing_ingredients[:2])}"
                 if len(missing_ingredients) > 2:
                     reason += f" and {len(missing_ingredients) - 2} more"
                 
                 unavailable_items.append({
-                    'name': menu_item.menu_item_name,
+                    'name': menu_item_name,
                     'reason': reason,
                     'estimatedRestock': '2-3 days'  # Default estimate
                 })
+                if len(unavailable_items) == 5:
+                    break
         
         return jsonify(unavailable_items[:5]), 200  # Limit to 5 for dashboard
         
@@ -179,36 +189,43 @@ def get_unavailable_items():
         logging.error(f"Error fetching unavailable items: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _order_totals_between(start, end):
+    """Count and sum customer orders placed in the half-open range [start, end)."""
+    return db.session.query(
+        func.count(CustomerOrder.id).label('order_count'),
+        func.sum(CustomerOrder.total_price).label('revenue_sum')
+    ).filter(
+        CustomerOrder.order_date >= start,
+        CustomerOrder.order_date < end
+    ).first()
+
 @dashboard_bp.route('/daily-sales', methods=['GET'])
 @cross_origin(origins="*")
+@etagged()
+@cached_response(timeout=30)
 def get_daily_sales():
     """Get daily sales metrics"""
     try:
         today = datetime.now().date()
         yesterday = today - timedelta(days=1)
+        today_start = datetime.combine(today, time.min)
         
-        # Get today's sales
-        today_orders = db.session.query(
-            func.count(CustomerOrder.id).label('order_count'),
-            func.sum(CustomerOrder.total_price).label('total_revenue')
-        ).filter(
-            func.date(CustomerOrder.order_date) == today
-        ).first()
+        # Get today's sales (range predicate so the order_date index can be used)
+        today_orders = _order_totals_between(today_start, today_start + timedelta(days=1))
         
-        # Get yesterday's sales for comparison
-        yesterday_orders = db.session.query(
-            func.count(CustomerOrder.id).label('order_count'),
-            func.sum(CustomerOrder.total_price).label('total_revenue')
-        ).filter(
-            func.date(CustomerOrder.order_date) == yesterday
-        ).first()
+        # Get yesterday's sales for comparison from the roll-up once it has been refreshed after midnight
+        yesterday_stats = db.session.get(DailyOrderStats, yesterday)
+        if yesterday_stats is None or yesterday_stats.refreshed_at < today_start:
+            yesterday_orders = _order_totals_between(today_start - timedelta(days=1), today_start)
+        else:
+            yesterday_orders = yesterday_stats
         
         # Calculate metrics
-        today_revenue = float(today_orders.total_revenue or 0)
+        today_revenue = float(today_orders.revenue_sum or 0)
         today_count = int(today_orders.order_count or 0)
         today_avg = today_revenue / today_count if today_count > 0 else 0
         
-        yesterday_revenue = float(yesterday_orders.total_revenue or 0)
+        yesterday_revenue = float(yesterday_orders.revenue_sum or 0)
         yesterday_count = int(yesterday_orders.order_count or 0)
         yesterday_avg = yesterday_revenue / yesterday_count if yesterday_count > 0 else 0
         
@@ -238,42 +255,37 @@ def get_daily_sales():
 
 @dashboard_bp.route('/price-analytics', methods=['GET'])
 @cross_origin(origins="*")
+@etagged()
+@cached_response(timeout=30)
 def get_price_analytics():
     """Get price analytics data"""
     try:
-        # Calculate average item price from menu items
-        avg_price_result = db.session.query(
-            func.avg(MenuItem.menu_price).label('avg_price')
-        ).filter(
-            MenuItem.menu_price.isnot(None),
-            MenuItem.menu_price > 0
-        ).first()
-        
-        avg_item_price = float(avg_price_result.avg_price or 0)
-        
-        # Calculate average revenue per order from recent orders
-        avg_revenue_result = db.session.query(
-            func.avg(CustomerOrder.total_price).label('avg_revenue')
-        ).filter(
-            CustomerOrder.order_date >= datetime.now() - timedelta(days=30)
-        ).first()
-        
-        revenue_per_order = float(avg_revenue_result.avg_revenue or 0)
-        
-        # Get price trends for popular items
+        # Average item price and 30-day average revenue per order in one round trip
+        avg_item_price, revenue_per_order = db.session.query(
+            db.session.query(func.avg(MenuItem.menu_price)).filter(
+                MenuItem.menu_price.isnot(None),
+                MenuItem.menu_price > 0
+            ).scalar_subquery(),
+            db.session.query(func.avg(CustomerOrder.total_price)).filter(
+                CustomerOrder.order_date >= datetime.now() - timedelta(days=30)
+            ).scalar_subquery()
+        ).one()
+        
+        avg_item_price = float(avg_item_price or 0)
+        revenue_per_order = float(revenue_per_order or 0)
+        
+        # Get price trends for popular items from the hourly order count roll-up
         popular_items = db.session.query(
             MenuItem.menu_item_name,
             MenuItem.menu_price,
-            func.count(CustomerOrder.id).label('order_count')
+            MenuItemOrderCounts.order_count
         ).join(
-            CustomerOrder, MenuItem.id == CustomerOrder.menu_item_id
+            MenuItemOrderCounts, MenuItemOrderCounts.menu_item_id == MenuItem.id
         ).filter(
             MenuItem.menu_price.isnot(None),
             MenuItem.menu_price > 0
-        ).group_by(
-            MenuItem.id, MenuItem.menu_item_name, MenuItem.menu_price
         ).order_by(
-            func.count(CustomerOrder.id).desc()
+            MenuItemOrderCounts.order_count.desc()
         ).limit(4).all()
         
         # Create price trends (simulated previous prices for demo)
@@ -281,7 +293,6 @@ def get_price_analytics():
         for item in popular_items:
             current_price = float(item.menu_price)
             # Simulate previous price (±10% variation)
-            import random
             variation = random.uniform(-0.1, 0.1)
             previous_price = current_price * (1 - variation)
             change_percent = ((current_price - previous_price) / previous_price) * 100
@@ -305,25 +316,28 @@ def get_price_analytics():
         logging.error(f"Error fetching price analytics: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _stock_alerts_version():
+    """Alerts are only ever inserted or deleted, so row count plus highest id identifies the current set."""
+    return tuple(db.session.query(func.count(StockAlert.id), func.max(StockAlert.id)).one())
+
 @dashboard_bp.route('/stock-alerts-count', methods=['GET'])
 @cross_origin(origins="*")
+@etagged(version=_stock_alerts_version)
 def get_stock_alerts_count():
     """Get total count of active stock alerts for dashboard display"""
     try:
-        # Count all active stock alerts
-        total_alerts = StockAlert.query.count()
-        
-        # Count by alert type for detailed breakdown
-        low_stock_count = StockAlert.query.filter_by(alert_type='low_stock').count()
-        predicted_stockout_count = StockAlert.query.filter_by(alert_type='predicted_stockout').count()
-        combined_count = StockAlert.query.filter_by(alert_type='low_stock_and_predicted_stockout').count()
+        # Count active stock alerts per type in one scan of the alert_type index
+        type_counts = dict(db.session.query(
+            StockAlert.alert_type,
+            func.count(StockAlert.id)
+        ).group_by(StockAlert.alert_type).all())
         
         alerts_data = {
-            'total_alerts': total_alerts,
+            'total_alerts': sum(type_counts.values()),
             'breakdown': {
-                'low_stock': low_stock_count,
-                'predicted_stockout': predicted_stockout_count,
-                'combined': combined_count
+                'low_stock': type_counts.get('low_stock', 0),
+                'predicted_stockout': type_counts.get('predicted_stockout', 0),
+                'combined': type_counts.get('low_stock_and_predicted_stockout', 0)
             }
         }
         
@@ -1,43 +1,48 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+import json
 import pandas as pd
 import os
 import re
 from datetime import datetime, timedelta, date
-from sqlalchemy import create_engine, text
-from config import Config
+from sqlalchemy import text
+from models import db
 from models.customer_order import CustomerOrder
+from utils.response_cache import cached_response
 
 bp = Blueprint('ingredient_usage', __name__)
 
+_UNIT_MAP = {
+    'slice': 'slices', 'slices': 'slices',
+    'pcs': 'pcs', 'piece': 'pcs', 'pieces': 'pcs',
+    'tbsp': 'tbsp', 'tablespoon': 'tbsp', 'tablespoons': 'tbsp',
+    'tsp': 'tsp', 'teaspoon': 'tsp', 'teaspoons': 'tsp',
+    'g': 'g', 'gram': 'g', 'grams': 'g',
+    'ml': 'ml', 'milliliter': 'ml', 'milliliters': 'ml',
+    'mg': 'mg', 'milligram': 'mg', 'milligrams': 'mg',
+    'leaf': 'leaves', 'leaves': 'leaves',
+    'ring': 'rings', 'rings': 'rings',
+    'base': 'bases', 'bases': 'bases'
+}
+_QUANTITY_PATTERN = re.compile(r"([\d.]+)\s*([a-zA-Z]+)")
+
 def parse_ingredient_string(ingredient_str):
-    unit_map = {
-        'slice': 'slices', 'slices': 'slices',
-        'pcs': 'pcs', 'piece': 'pcs', 'pieces': 'pcs',
-        'tbsp': 'tbsp', 'tablespoon': 'tbsp', 'tablespoons': 'tbsp',
-        'tsp': 'tsp', 'teaspoon': 'tsp', 'teaspoons': 'tsp',
-        'g': 'g', 'gram': 'g', 'grams': 'g',
-        'ml': 'ml', 'milliliter': 'ml', 'milliliters': 'ml',
-        'mg': 'mg', 'milligram': 'mg', 'milligrams': 'mg',
-        'leaf': 'leaves', 'leaves': 'leaves',
-        'ring': 'rings', 'rings': 'rings',
-        'base': 'bases', 'bases': 'bases'
-    }
     result = {}
     for item in ingredient_str.split(','):
         name, qty = item.strip().rsplit('(', 1)
         name = name.strip()
         qty = qty.strip(')').strip()
-        match = re.match(r"([\d.]+)\s*([a-zA-Z]+)", qty)
+        match = _QUANTITY_PATTERN.match(qty)
         if match:
             amount, unit = match.groups()
             unit = unit.lower()
-            unit = unit_map.get(unit, unit)  # 标准化单位
+            unit = _UNIT_MAP.get(unit, unit)  # 标准化单位
             result[name] = {'amount': float(amount), 'unit': unit}
         else:
             result[name] = {'amount': 0, 'unit': ''}
     return result
 
 @bp.route('/api/ingredient-usage-trends', methods=['GET'])
+@cached_response(timeout=300)
 def ingredient_usage_trends():
     """Get ingredient usage trends from customer orders."""
     try:
@@ -61,99 +66,56 @@ def ingredient_usage_trends():
         
         if range_type == 'daily':
             # Get daily usage trends
-            result = []
-            current_date = start_date
-            while current_date <= end_date:
-                daily_usage = CustomerOrder.get_daily_ingredient_usage(current_date)
-                for usage in daily_usage:
-                    if unit_filter and unit_filter != 'all' and usage['unit'] != unit_filter:
-                        continue
-                    result.append({
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'ingredient': usage['ingredient_name'],
-                        'usage': float(usage['total_quantity']),
-                        'unit': usage['unit'],
-                        'category': usage['category']
-                    })
-                current_date += timedelta(days=1)
+            rows = CustomerOrder.get_ingredient_usage_range(start_date, end_date, unit_filter)
+            result = [{
+                'date': str(row.usage_date),
+                'ingredient': row.ingredient_name,
+                'usage': float(row.total_quantity),
+                'unit': row.unit,
+                'category': row.category
+            } for row in rows]
             return jsonify({'daily': result})
         
         elif range_type == 'weekly':
-            # Get weekly aggregated usage
+            # Get weekly aggregated usage, bucketing daily rows by the Monday of their week
+            week_start = start_date - timedelta(days=start_date.weekday())
+            rows = CustomerOrder.get_ingredient_usage_range(week_start, end_date, unit_filter)
+            week_usage = {}
+            for row in rows:
+                row_week_start = row.usage_date - timedelta(days=row.usage_date.weekday())
+                key = (row_week_start, row.ingredient_name)
+                if key not in week_usage:
+                    week_usage[key] = {
+                        'usage': 0,
+                        'unit': row.unit,
+                        'category': row.category
+                    }
+                week_usage[key]['usage'] += row.total_quantity
+            
             result = []
-            current_date = start_date
-            while current_date <= end_date:
-                week_start = current_date - timedelta(days=current_date.weekday())
-                week_end = week_start + timedelta(days=6)
-                week_usage = {}
-                
-                # Aggregate usage for the week
-                for day in range(7):
-                    day_date = week_start + timedelta(days=day)
-                    if day_date > end_date:
-                        break
-                    daily_usage = CustomerOrder.get_daily_ingredient_usage(day_date)
-                    for usage in daily_usage:
-                        if unit_filter and unit_filter != 'all' and usage['unit'] != unit_filter:
-                            continue
-                        key = usage['ingredient_name']
-                        if key not in week_usage:
-                            week_usage[key] = {
-                                'usage': 0,
-                                'unit': usage['unit'],
-                                'category': usage['category']
-                            }
-                        week_usage[key]['usage'] += usage['total_quantity']
-                
-                week_str = f"{week_start.year}-W{week_start.isocalendar()[1]:02d}"
-                for ingredient, data in week_usage.items():
-                    result.append({
-                        'week': week_str,
-                        'ingredient': ingredient,
-                        'usage': float(data['usage']),
-                        'unit': data['unit'],
-                        'category': data['category']
-                    })
-                
-                current_date = week_end + timedelta(days=1)
+            for (row_week_start, ingredient), data in week_usage.items():
+                result.append({
+                    'week': f"{row_week_start.year}-W{row_week_start.isocalendar()[1]:02d}",
+                    'ingredient': ingredient,
+                    'usage': float(data['usage']),
+                    'unit': data['unit'],
+                    'category': data['category']
+                })
             return jsonify({'weekly': result})
         
         elif range_type == 'monthly':
-            # Get monthly aggregated usage
-            result = []
-            current_date = start_date.replace(day=1)  # Start from first day of month
-            
-            while current_date <= end_date:
-                # Get last day of current month
-                if current_date.month == 12:
-                    next_month = current_date.replace(year=current_date.year + 1, month=1)
-                else:
-                    next_month = current_date.replace(month=current_date.month + 1)
-                month_end = next_month - timedelta(days=1)
-                
-                if month_end > end_date:
-                    month_end = end_date
-                
-                # Get category distribution for the month
-                month_usage, month_units = CustomerOrder.get_ingredient_category_distribution(current_date, month_end)
-                
-                month_str = current_date.strftime('%Y-%m')
-                for category, usage in month_usage.items():
-                    if unit_filter and unit_filter != 'all':
-                        # For monthly view, we'll show all categories but note the filter
-                        pass
-                    result.append({
-                        'month': month_str,
-                        'category': category,
-                        'usage': float(usage)
-                    })
-                
-                # Move to next month
-                if current_date.month == 12:
-                    current_date = current_date.replace(year=current_date.year + 1, month=1)
-                else:
-                    current_date = current_date.replace(month=current_date.month + 1)
+            # Get monthly aggregated usage per category (unit filter is not applied to the monthly view)
+            rows = CustomerOrder.get_ingredient_usage_range(start_date.replace(day=1), end_date)
+            month_usage = {}
+            for row in rows:
+                key = (row.usage_date.strftime('%Y-%m'), row.category)
+                month_usage[key] = month_usage.get(key, 0) + row.total_quantity
             
+            result = [{
+                'month': month_str,
+                'category': category,
+                'usage': float(usage)
+            } for (month_str, category), usage in month_usage.items()]
             return jsonify({'monthly': result})
         
         else:
@@ -163,6 +125,7 @@ def ingredient_usage_trends():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/api/ingredient-category-distribution', methods=['GET'])
+@cached_response(timeout=300)
 def ingredient_category_distribution():
     """Get ingredient usage distribution by category from customer orders."""
     try:
@@ -230,50 +193,64 @@ def forecasted_demand():
     end_date = request.args.get('end_date')
     if not ingredient_id:
         return {'error': 'ingredient_id is required'}, 400
-    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
-    with engine.connect() as conn:
-        # 历史 usage
-        actual_sql = """
-            SELECT used_on as date, SUM(quantity_used) as actual
-            FROM ingredient_usage
-            WHERE ingredient_id = :ingredient_id
-        """
-        if start_date:
-            actual_sql += " AND used_on >= :start_date"
-        if end_date:
-            actual_sql += " AND used_on <= :end_date"
-        actual_sql += " GROUP BY used_on"
-        params = {'ingredient_id': ingredient_id}
-        if start_date:
-            params['start_date'] = start_date
-        if end_date:
-            params['end_date'] = end_date
+    # 历史 usage
+    actual_sql = """
+        SELECT used_on as date, SUM(quantity_used) as actual
+        FROM ingredient_usage
+        WHERE ingredient_id = :ingredient_id
+    """
+    if start_date:
+        actual_sql += " AND used_on >= :start_date"
+    if end_date:
+        actual_sql += " AND used_on <= :end_date"
+    actual_sql += " GROUP BY used_on"
+    params = {'ingredient_id': ingredient_id}
+    if start_date:
+        params['start_date'] = start_date
+    if end_date:
+        params['end_date'] = end_date
+    # 预测
+    forecast_sql = """
+        SELECT date, predicted_quantity as forecast
+        FROM forecasted_demand
+        WHERE ingredient_id = :ingredient_id
+    """
+    if start_date:
+        forecast_sql += " AND date >= :start_date"
+    if end_date:
+        forecast_sql += " AND date <= :end_date"
+    forecast_sql += " ORDER BY date"
+
+    # Both queries run before the response starts, so database errors still produce an error status
+    conn = db.engine.connect()
+    try:
         actual_rows = conn.execute(text(actual_sql), params).fetchall()
         actual_map = {str(row[0]): float(row[1]) for row in actual_rows}
-        # 预测
-        forecast_sql = """
-            SELECT date, predicted_quantity as forecast
-            FROM forecasted_demand
-            WHERE ingredient_id = :ingredient_id
-        """
-        if start_date:
-            forecast_sql += " AND date >= :start_date"
-        if end_date:
-            forecast_sql += " AND date <= :end_date"
-        forecast_sql += " ORDER BY date"
-        forecast_rows = conn.execute(text(forecast_sql), params).fetchall()
-        result = []
-        for row in forecast_rows:
-            date = str(row[0])
-            forecast = float(row[1])
-            actual = actual_map.get(date)
-            result.append({'date': date, 'actual': actual, 'forecast': forecast})
-    return jsonify(result)
+        # Forecast rows come off a server-side cursor and are written out as they arrive
+        forecast_rows = conn.execution_options(stream_results=True, max_row_buffer=1000).execute(text(forecast_sql), params)
+    except Exception:
+        conn.close()
+        raise
+
+    def generate():
+        try:
+            yield '['
+            for index, row in enumerate(forecast_rows):
+                forecast_date = str(row[0])
+                item = {'date': forecast_date, 'actual': actual_map.get(forecast_date), 'forecast': float(row[1])}
+                yield (',' if index else '') + json.dumps(item)
+            yield ']'
+        finally:
+            conn.close()
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    # Also release the connection if the client goes away before streaming starts
+    response.call_on_close(conn.close)
+    return response
 
 @bp.route('/api/ingredient-list', methods=['GET'])
 def ingredient_list():
-    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
-    with engine.connect() as conn:
+    with db.engine.connect() as conn:
         rows = conn.execute(text("SELECT id, name FROM ingredients ORDER BY name")).fetchall()
         result = [{'id': row[0], 'name': row[1]} for row in rows]
     return jsonify(result)
\ No newline at end of file
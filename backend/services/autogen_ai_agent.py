@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from dotenv import load_dotenv
+from sqlalchemy import or_
 
 # Load environment variables
 load_dotenv()
@@ -584,13 +585,15 @@ class AutoGenRestaurantAI:
     def _step4_create_recipe(self, dish_suggestion: DishSuggestion, menu_item_id: int) -> Dict[str, Any]:
         """Step 4: Set recipe and insert to recipes table"""
         try:
-            # Get ingredients from database that match the dish ingredients
+            # Get ingredients from database that match the dish ingredients in one query
             recipes_created = 0
+            candidates = Ingredient.query.filter(
+                or_(*(Ingredient.name.ilike(f'%{ingredient_name}%') for ingredient_name in dish_suggestion.ingredients))
+            ).order_by(Ingredient.id).all() if dish_suggestion.ingredients else []
             
             for ingredient_name in dish_suggestion.ingredients:
-                ingredient = Ingredient.query.filter(
-                    Ingredient.name.ilike(f'%{ingredient_name}%')
-                ).first()
+                ingredient_name_lower = ingredient_name.lower()
+                ingredient = next((candidate for candidate in candidates if ingredient_name_lower in candidate.name.lower()), None)
                 
                 if ingredient:
                     # Calculate quantity based on ingredient type